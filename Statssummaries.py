@@ -1,22 +1,148 @@
+import weakref
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
+from pandas.api.indexers import BaseIndexer
 from processor import DataProcessor
+from compact import CompactOHLCV
+from sharedmem import attach
+from rolling import rolling_moments, rolling_quantiles
+from kernels import smooth_true_range, true_range
+from instrumentation import instrumented
+
+def _root_array(series):
+    """
+    The ndarray that owns the memory of a column (its views are new objects on every access).
+    """
+    array = series.to_numpy()
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
 
 class Statssummaries:
-    def __init__(self, data, price_column='close'):
+    def __init__(self, data, price_column='close', cache_size=128, copy=True):
         """
         Initializations
-        :param data: DataFrame includes market data
+        :param data: DataFrame includes market data, or a CompactOHLCV store (shared, not copied)
         :param price_column: the name of price column
+        :param cache_size: Number of intermediate Series kept by the memoization layer (0 disables it).
+        :param copy: Copy the DataFrame (default). With False it is wrapped by a shallow copy sharing its column
+            arrays; under pandas copy-on-write neither side sees the other's later writes, without it call
+            invalidate_cache() after modifying the caller's frame in place.
+        Memoized results are checked against the columns they were computed from, so assigning a new frame to data
+        or a new column to data[column] is picked up; only in-place writes into a column need invalidate_cache().
         """
-        self.data = data.copy()
+        self._cache = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # a compact store is read-only, so it is shared instead of copied
+        self.data = data if isinstance(data, CompactOHLCV) else data.copy(deep=copy)
         self.price_column = price_column
 
         # Check if the index is datetime index already
         if not isinstance(self.data.index, pd.DatetimeIndex):
             raise ValueError("Index must be a DatetimeIndex. Ensure your data's index is properly set to datetime.")
 
+    @classmethod
+    def from_shared(cls, name, root=None, price_column='close', cache_size=128):
+        """
+        Attach to a dataset published with sharedmem.SharedDatasetRegistry, without loading or copying it.
+        :param name: Dataset name given to publish().
+        :param root: Directory of the published datasets (default is sharedmem.default_root()).
+        :return: Statssummaries over the read-only shared arrays.
+        """
+        return cls(attach(name, root), price_column=price_column, cache_size=cache_size)
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        # assigning new data drops every memoized result
+        self._data = data
+        self.invalidate_cache()
 
+    def invalidate_cache(self):
+        """
+        Drop every memoized intermediate result. Call it after writing into a column of self.data in place
+        (e.g. data.loc[...] = ...); reassigned columns are detected without it.
+        """
+        self._cache.clear()
+
+    def cache_info(self):
+        """
+        Memoization statistics.
+        :return: dict with hits, misses, current size and maximum size.
+        """
+        return {'hits': self.cache_hits, 'misses': self.cache_misses, 'size': len(self._cache), 'maxsize': self.cache_size}
+
+    def _memoize(self, key, compute, columns=None):
+        """
+        Return the cached result for key (metric, window, column, method), computing it on a miss.
+        An entry only hits while the columns it was computed from (default is the price column) still hold the same
+        arrays, so a reassigned column recomputes it.
+        The least recently used entry is evicted once cache_size entries are stored.
+        Callers get a shallow copy: it shares the cached data, and with copy-on-write an in-place change to it copies
+        first, so it never reaches the cache.
+        """
+        columns = columns or (self.price_column,)
+        entry = self._cache.get(key)
+        if entry is not None and self._is_current(entry[1]):
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return entry[0].copy(deep=False)
+        self.cache_misses += 1
+        value = compute()
+        if self.cache_size > 0:
+            self._cache[key] = (value, self._column_sources(columns))
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value.copy(deep=False)
+
+    def _column_sources(self, columns):
+        # weak references to the arrays holding each column: a dead reference or another array means the column
+        # was replaced, and an array that is still referenced cannot have its address reused
+        return tuple((column, weakref.ref(_root_array(self.data[column]))) for column in columns)
+
+    def _is_current(self, sources):
+        try:
+            return all(_root_array(self.data[column]) is source() for column, source in sources)
+        except KeyError:
+            return False
+
+    def _rolling(self, metric, window, center=False):
+        def compute():
+            price = self.data[self.price_column]
+            if metric == 'median' and not center:
+                median = rolling_quantiles(price.to_numpy(dtype=float), window, [0.5])[0]
+                return pd.Series(median, index=price.index, name=price.name)
+            return getattr(price.rolling(window, center=center), metric)()
+        return self._memoize((metric, window, self.price_column, 'centered' if center else 'rolling'), compute)
+
+    def _expanding(self, metric, window):
+        return self._memoize((metric, window, self.price_column, 'expanding'),
+                             lambda: getattr(self.data[self.price_column].expanding(window), metric)())
+
+    def _column(self, column):
+        # float32 columns of a compact store are widened so every metric is computed in float64
+        series = self.data[column]
+        return series.astype(np.float64) if series.dtype == np.float32 else series
+
+    def _true_range(self):
+        def compute():
+            close = self._column(self.price_column)
+            tr = true_range(self._column('high').to_numpy(), self._column('low').to_numpy(), close.to_numpy())
+            return pd.Series(tr, index=close.index)
+        return self._memoize(('true_range', None, self.price_column, 'atr'), compute,
+                             columns=(self.price_column, 'high', 'low'))
+
+    @instrumented
     def calculate_rolling_statistics(self, window=1, metrics=['mean', 'median', 'std']):
         """
         Calculate the rolling window statistics.
@@ -27,16 +153,17 @@ class Statssummaries:
         results = {}
         for metric in metrics:
             if metric == 'mean':
-                results['Rolling_Mean'] = self.data[self.price_column].rolling(window).mean()  # moving average
+                results['Rolling_Mean'] = self._rolling('mean', window)  # moving average
             elif metric == 'median':
-                results['Rolling_Median'] = self.data[self.price_column].rolling(window).median()
+                results['Rolling_Median'] = self._rolling('median', window)
             elif metric == 'std':
-                results['Rolling_Std'] = self.data[self.price_column].rolling(window).std()
+                results['Rolling_Std'] = self._rolling('std', window)
             else:
                 raise ValueError(f"Unsupported metric: {metric}")
 
         return pd.DataFrame(results)
 
+    @instrumented
     def calculate_expanding_statistics(self, window=1, metrics=['mean', 'std']):
         """
         Calculate expanding window statistics.
@@ -46,89 +173,346 @@ class Statssummaries:
         results = {}
         for metric in metrics:
             if metric == 'mean':
-                results['Expanding_Mean'] = self.data[self.price_column].expanding(window).mean()
+                results['Expanding_Mean'] = self._expanding('mean', window)
             elif metric == 'std':
-                results['Expanding_Std'] = self.data[self.price_column].expanding(window).std()
+                results['Expanding_Std'] = self._expanding('std', window)
             else:
                 raise ValueError(f"Unsupported metric: {metric}")
 
         return pd.DataFrame(results)
 
-    def calculate_volatility(self, method='std', window=None):
+    @instrumented
+    def calculate_volatility(self, method='std', window=None, smoothing='sma'):
         """
         Calculate volatility metrics.
         :param method: 'std' (standard deviation) or 'atr' (average true range).
         :param window: Window size for rolling calculations (required for ATR).
+        :param smoothing: ATR smoothing, 'sma' (moving average of the true range) or 'wilder'.
         :return: Series with volatility metrics.
         """
         if method == 'std':
-            return self.data[self.price_column].rolling(window).std()
+            return self._rolling('std', window)
         elif method == 'atr':
             if window is None:
                 raise ValueError("ATR requires window size to be specified")
-            
-            high_low = self.data['high'] - self.data['low']
-            high_close = np.abs(self.data['high'] - self.data[self.price_column].shift())
-            low_close = np.abs(self.data['low'] - self.data[self.price_column].shift())
-            tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-            atr = tr.rolling(window).mean()
-            return atr
+
+            tr = self._true_range()
+            key = 'atr' if smoothing == 'sma' else f'atr_{smoothing}'
+            return self._memoize(('mean', window, self.price_column, key),
+                                 lambda: pd.Series(smooth_true_range(tr.to_numpy(), window, smoothing), index=tr.index),
+                                 columns=(self.price_column, 'high', 'low'))
         else:
             raise ValueError(f"Unsupported method: {method}")
 
+    @instrumented
     def calculate_rate_of_change(self, period):
         """
         Calculate the rate of change (RoC) metric.
         :param period: Period for RoC calculation.
         :return: Series with RoC values.
         """
-        return self.data[self.price_column].pct_change(periods=period) * 100 # Percentage change between neighboring data points
+        # Percentage change between neighboring data points
+        return self._memoize(('roc', period, self.price_column, 'pct_change'),
+                             lambda: self._column(self.price_column).pct_change(periods=period) * 100)
+
+    @instrumented
+    def rolling_sweep(self, windows, metrics=['mean', 'std'], as_array=False):
+        """
+        Calculate rolling metrics for many window sizes in one pass. Mean and std for every window come from
+        one set of prefix sums of the price (and of its square), ATR from one set of prefix sums of the true range.
+        :param windows: List of window sizes.
+        :param metrics: List of metrics to calculate ('mean', 'std', 'atr').
+        :param as_array: Return a 3-D array (rows, metrics, windows) instead of a DataFrame.
+        :return: DataFrame with (metric, window) columns ('Rolling_Mean', 'Rolling_Std', 'ATR'), or the 3-D array.
+        """
+        names = {'mean': 'Rolling_Mean', 'std': 'Rolling_Std', 'atr': 'ATR'}
+        for metric in metrics:
+            if metric not in names:
+                raise ValueError(f"Unsupported metric: {metric}")
+        windows = [int(window) for window in windows]
+        if not windows or min(windows) < 1:
+            raise ValueError("Windows must be positive integers")
+
+        # metrics x windows x rows, so every window writes one contiguous row
+        result = np.empty((len(metrics), len(windows), len(self.data)))
+        rows = {metric: i for i, metric in enumerate(metrics)}
+        if 'mean' in metrics or 'std' in metrics:
+            mean_out = result[rows['mean']] if 'mean' in metrics else np.empty((len(windows), len(self.data)))
+            var_out = result[rows['std']] if 'std' in metrics else None
+            rolling_moments(self.data[self.price_column].to_numpy(dtype=float), windows, mean_out, var_out)
+            if var_out is not None:
+                np.sqrt(var_out, out=var_out)
+        if 'atr' in metrics:
+            rolling_moments(self._true_range().to_numpy(dtype=float), windows, result[rows['atr']])
 
-    def simple_seasonal_decomposition(self, method = 'additive', freq = 12):
+        if as_array:
+            return result.transpose(2, 0, 1)
+        columns = pd.MultiIndex.from_product([[names[metric] for metric in metrics], windows], names=['metric', 'window'])
+        return pd.DataFrame(result.reshape(-1, len(self.data)).T, index=self.data.index, columns=columns, copy=False)
+
+    @instrumented
+    def simple_seasonal_decomposition(self, method = 'additive', freq = 12, periods = None):
         """
         Perform simple seasonal decomposition
         :param method: residual can be computed by 'additive' or 'multiplicative'
-        :param freq: Frequency of the data for seasonal decomposition.
-        :return: Seasonal decomposition result.
+        :param freq: Frequency of the data for seasonal decomposition (window of the centered rolling mean trend).
+        :param periods: Seasonal periods removed one after another, each a number of rows (int) or a duration
+            ('1D', '7D', Timedelta) counted from the epoch, e.g. ['1D', '7D'] for daily plus weekly seasonality of
+            intraday bars. Default is None, a single day-of-month season.
+        :return: Seasonal decomposition result: 'trend', 'seasonal' (all seasons combined), 'residual' and,
+            when periods are given, 'seasonal_<period>' for each period.
         """
-        # trend
-        trend = self.data[self.price_column].rolling(window=freq, center=True).mean()
-
-        # seasonal decomposition
-        if method == 'additive':
-            detrended = self.data[self.price_column] - trend
-        elif method == 'multiplicative':
-            detrended = self.data[self.price_column] / trend
-        else:
+        if method not in ['additive', 'multiplicative']:
             raise ValueError("Unsupported method. Use 'additive' or 'multiplicative'.")
+        additive = method == 'additive'
+        price = self.data[self.price_column]
+        values = price.to_numpy(dtype=float)
+
+        # trend (shared by the additive and multiplicative paths through the cache)
+        trend = self._rolling('mean', freq, center=True)
 
-        seasonal = detrended.groupby(self.data.index.to_period(f"{freq}D").strftime('%d')).transform('mean')
+        # seasonal decomposition: the mean of the detrended series per phase of each period
+        detrended = values - trend.to_numpy() if additive else values / trend.to_numpy()
+        seasonal = np.zeros(len(values)) if additive else np.ones(len(values))
+        result = {'trend': trend}
+        for period in (periods if periods is not None else [None]):
+            phase, n_phases = self._season_phase(period)
+            season = self._phase_means(detrended, phase, n_phases)
+            if additive:
+                detrended = detrended - season
+                seasonal += season
+            else:
+                detrended = detrended / season
+                seasonal *= season
+            if periods is not None:
+                result[f'seasonal_{period}'] = pd.Series(season, index=price.index, name=price.name)
 
         # residual
-        if method == 'additive':
-            residual = self.data[self.price_column] - trend - seasonal
-        elif method == 'multiplicative':
-            residual = self.data[self.price_column] / (trend * seasonal)
-
-        return {
-            'trend': trend,
-            'seasonal': seasonal,
-            'residual': residual
+        if additive:
+            residual = values - trend.to_numpy() - seasonal
+        else:
+            residual = values / (trend.to_numpy() * seasonal)
+
+        result['seasonal'] = pd.Series(seasonal, index=price.index, name=price.name)
+        result['residual'] = pd.Series(residual, index=price.index, name=price.name)
+        return result
+
+    def _season_phase(self, period):
+        """
+        Integer phase of every row within a seasonal period.
+        :return: (phase codes in 0..n_phases-1, n_phases)
+        """
+        index = self.data.index
+        if period is None:
+            return index.day.to_numpy() - 1, 31
+        if isinstance(period, (int, np.integer)):
+            if period < 1:
+                raise ValueError("Seasonal periods must be positive.")
+            return np.arange(len(index)) % period, int(period)
+
+        length = pd.Timedelta(period).value
+        if length <= 0:
+            raise ValueError("Seasonal periods must be positive.")
+        offsets = index.to_numpy().astype('datetime64[ns]').view(np.int64) % length
+        # bars on a regular grid map to consecutive codes; irregular ones fall back to their distinct offsets
+        step = np.gcd(np.gcd.reduce(offsets), length)
+        if length // step <= max(len(offsets), 1):
+            return offsets // step, int(length // step)
+        distinct, phase = np.unique(offsets, return_inverse=True)
+        return phase, len(distinct)
+
+    @staticmethod
+    def _phase_means(values, phase, n_phases):
+        """
+        Mean of the non-NaN values of each phase, broadcast back to the rows (NaN for phases without values).
+        """
+        valid = ~np.isnan(values)
+        sums = np.bincount(phase[valid], weights=values[valid], minlength=n_phases)
+        counts = np.bincount(phase[valid], minlength=n_phases)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = sums / counts
+        return means[phase]
+
+    @instrumented
+    def summary(self, rolling_window=20, roc_period=10, atr_window=14, out=None):
+        """
+        Return a summary of rolling window statistics, volatility and rate of change.
+        :param out: Optional preallocated output for the metric columns: a DataFrame on the same index, or a dict
+            whose arrays are filled in place (missing keys are added). The input columns are not written to it.
+        :return: DataFrame with the input columns and the metrics (NaN replaced by 0), or out when given.
+        """
+        metrics = {
+            'Rolling_Mean': self._rolling('mean', rolling_window),
+            'Rolling_Std': self._rolling('std', rolling_window),
+            'Rate_of_Change(%)': self.calculate_rate_of_change(roc_period),
+            'ATR': self.calculate_volatility(method='atr', window=atr_window),
         }
 
+        if out is not None:
+            if isinstance(out, pd.DataFrame) and not out.index.equals(self.data.index):
+                raise ValueError("out must have the same index as the data.")
+            for name, values in metrics.items():
+                self._write_filled(out, name, values.to_numpy())
+            return out
+
+        # a shallow copy: under copy-on-write only the input columns holding NaN are materialized again
+        summary = self.data.to_frame() if isinstance(self.data, CompactOHLCV) else self.data.copy(deep=False)
+        for column in summary.columns:
+            if summary[column].hasnans:
+                summary[column] = summary[column].fillna(0)
+        for name, values in metrics.items():
+            summary[name] = values.fillna(0)
+
+        return summary
+
+    @staticmethod
+    def _write_filled(out, name, values):
+        """
+        Write values into out[name] with NaN replaced by 0, reusing the existing array when there is one.
+        """
+        if isinstance(out, pd.DataFrame):
+            if name in out.columns:
+                # .loc assignment writes into the existing column, the NaN mask is the only temporary
+                out.loc[:, name] = values
+                out.loc[np.isnan(values), name] = 0.0
+            else:
+                out[name] = np.where(np.isnan(values), 0.0, values)
+            return
+        target = out.get(name)
+        if target is None:
+            out[name] = np.where(np.isnan(values), 0.0, values)
+        else:
+            if len(target) != len(values):
+                raise ValueError(f"out['{name}'] must have length {len(values)}.")
+            np.copyto(target, values)
+            np.copyto(target, 0.0, where=np.isnan(values))
+
+
+class _SymbolWindowIndexer(BaseIndexer):
+    """
+    Trailing windows of fixed size that are cut at the first row of each symbol.
+    """
+    def __init__(self, position, window):
+        super().__init__(window_size=window)
+        self.position = position
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        start = end - np.minimum(self.position + 1, self.window_size)
+        return start, end
+
+
+class PanelStatssummaries:
+    def __init__(self, data, price_column='close', symbol_column='symbol'):
+        """
+        Initializations for a multi-symbol panel, so every metric is computed for all symbols in one pass.
+        :param data: long-format DataFrame with a symbol column and a DatetimeIndex (or a 'date' column),
+                     or a DataFrame indexed by a (symbol, date) MultiIndex
+        :param price_column: the name of price column
+        :param symbol_column: the name of symbol column for long-format data
+        """
+        if isinstance(data.index, pd.MultiIndex):
+            panel = data
+        elif symbol_column in data.columns:
+            if isinstance(data.index, pd.DatetimeIndex):
+                panel = data.set_index(symbol_column, append=True).swaplevel(0, 1)
+            elif 'date' in data.columns:
+                panel = data.set_index([symbol_column, 'date'])
+            else:
+                raise ValueError("Long-format data needs a DatetimeIndex or a 'date' column.")
+        else:
+            raise ValueError(f"Column {symbol_column} not found in data.")
+
+        if panel.index.nlevels != 2 or not isinstance(panel.index.levels[1], pd.DatetimeIndex):
+            raise ValueError("Index must be a (symbol, DatetimeIndex) MultiIndex.")
+
+        self.data = panel.sort_index()  # sorting also gives the panel its own copy
+        self.price_column = price_column
+
+        # position of every row inside its own symbol, so no window reaches into the previous symbol
+        codes = self.data.index.codes[0]
+        new_symbol = np.ones(len(codes), dtype=bool)
+        new_symbol[1:] = codes[1:] != codes[:-1]
+        self._starts = np.flatnonzero(new_symbol)
+        self._position = np.arange(len(codes)) - self._starts[np.cumsum(new_symbol) - 1]
+
+    def _rolling(self, values, window):
+        """
+        Rolling window over the whole panel whose windows restart at every symbol.
+        """
+        return pd.Series(values, index=self.data.index).rolling(_SymbolWindowIndexer(self._position, window), min_periods=window)
+
+    @instrumented
+    def calculate_rolling_statistics(self, window=1, metrics=['mean', 'median', 'std']):
+        """
+        Calculate the rolling window statistics for every symbol.
+        :param window: Window size for rolling calculations.
+        :param metrics: List of metrics to calculate ('mean', 'median', 'std').
+        :return: DataFrame with rolling statistics.
+        """
+        rolling = self._rolling(self.data[self.price_column].to_numpy(), window)
+        results = {}
+        for metric in metrics:
+            if metric == 'mean':
+                results['Rolling_Mean'] = rolling.mean()
+            elif metric == 'median':
+                results['Rolling_Median'] = rolling.median()
+            elif metric == 'std':
+                results['Rolling_Std'] = rolling.std()
+            else:
+                raise ValueError(f"Unsupported metric: {metric}")
+
+        return pd.DataFrame(results, index=self.data.index)
+
+    @instrumented
+    def calculate_volatility(self, method='std', window=None):
+        """
+        Calculate volatility metrics for every symbol.
+        :param method: 'std' (standard deviation) or 'atr' (average true range).
+        :param window: Window size for rolling calculations (required for ATR).
+        :return: Series with volatility metrics.
+        """
+        if method == 'std':
+            return self.calculate_rolling_statistics(window, metrics=['std'])['Rolling_Std']
+        elif method == 'atr':
+            if window is None:
+                raise ValueError("ATR requires window size to be specified")
+
+            high = self.data['high'].to_numpy(dtype=float)
+            low = self.data['low'].to_numpy(dtype=float)
+            prev_close = np.roll(self.data[self.price_column].to_numpy(dtype=float), 1)
+            prev_close[self._starts] = np.nan  # first bar of a symbol has no previous close
+            # fmax skips NaN the same way DataFrame.max(axis=1) does
+            tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+            return self._rolling(tr, window).mean()
+        else:
+            raise ValueError(f"Unsupported method: {method}")
+
+    @instrumented
+    def calculate_rate_of_change(self, period):
+        """
+        Calculate the rate of change (RoC) metric for every symbol.
+        :param period: Period for RoC calculation.
+        :return: Series with RoC values.
+        """
+        roc = self.data[self.price_column].pct_change(periods=period) * 100
+        return roc.where(self._position >= period)  # shifted close must come from the same symbol
+
+    @instrumented
     def summary(self, rolling_window=20, roc_period=10, atr_window=14):
         """
-        Return a summary of rolling window statistics, volatility and rate of change.
+        Return a summary of rolling window statistics, volatility and rate of change for every symbol.
+        Rows for one symbol match Statssummaries(...).summary() on that symbol alone.
         """
         summary = self.data.copy()
-        
+
         rolling_stats = self.calculate_rolling_statistics(rolling_window, metrics=['mean', 'std'])
         summary = summary.join(rolling_stats)
-        
+
         summary['Rate_of_Change(%)'] = self.calculate_rate_of_change(roc_period)
-        
+
         summary['ATR'] = self.calculate_volatility(method='atr', window=atr_window)
-        
-        summary.fillna(0, inplace=True)  # 
+
+        summary.fillna(0, inplace=True)
 
         return summary
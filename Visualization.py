@@ -1,37 +1,187 @@
+import os
+
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from instrumentation import instrumented
+
+
+def minmax_indices(y, n_out):
+    '''
+    @purpose: To pick the positions of the minimum and maximum of y in n_out // 2 equal buckets, so every peak and trough survives.
+    @parameters:
+        - y: 1-D array without NaNs.
+        - n_out: Number of points to keep at most.
+    @return: Sorted integer positions, always including the first and last point.
+    '''
+    y = np.asarray(y)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    size = -(-n // max(n_out // 2 - 1, 1))
+    full = n // size
+    # the full buckets are a reshaped view of y, only the tail bucket is handled on its own
+    blocks = y[:full * size].reshape(full, size)
+    offsets = np.arange(full) * size
+    picks = [blocks.argmin(axis=1) + offsets, blocks.argmax(axis=1) + offsets, [0, n - 1]]
+    if full * size < n:
+        tail = y[full * size:]
+        picks.append([full * size + tail.argmin(), full * size + tail.argmax()])
+    return np.unique(np.concatenate(picks).astype(np.int64))
+
+
+def lttb_indices(x, y, n_out):
+    '''
+    @purpose: To pick n_out points with Largest-Triangle-Three-Buckets: in every bucket the point forming the largest triangle with the previously kept point and the mean of the next bucket.
+    @parameters:
+        - x: 1-D float array of increasing x values.
+        - y: 1-D array without NaNs.
+        - n_out: Number of points to keep (at least 3).
+    @return: Sorted integer positions, always including the first and last point.
+    '''
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    # n_out - 2 buckets between the first and the last point, the last point is the bucket after the final one
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(np.int64), n)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], edges[i + 2]
+        x_next, y_next = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        x_prev, y_prev = x[previous], y[previous]
+        area = np.abs((x_prev - x_next) * (y[lo:hi] - y_prev) - (x_prev - x[lo:hi]) * (y_next - y_prev))
+        previous = lo + int(area.argmax())
+        selected[i + 1] = previous
+    return selected
 
 
 class VisualizationModule:
-    def __init__(self, data, analysis_tools):  
+    def __init__(self, data, analysis_tools, max_points=4000, downsample='minmax', output_dir=None, name=None,
+                 file_format='png', dpi=100):
+        '''
+        @purpose: To set up the plots.
+        @parameters:
+            - data: The dataset (plots read the data of analysis_tools).
+            - analysis_tools: Statssummaries object.
+            - max_points: Series longer than this are downsampled before plotting. Defaults to 4000.
+            - downsample: 'minmax' (min and max per bucket), 'lttb' or None to plot every point. Defaults to 'minmax'.
+            - output_dir: Batch mode: figures are rendered with Agg and saved here instead of shown. Defaults to None.
+            - name: Prefix of the saved file names, e.g. the stock code. Defaults to None.
+            - file_format: Image format of the saved figures. Defaults to 'png'.
+            - dpi: Resolution of the saved figures. Defaults to 100.
+        '''
+        if downsample not in ('minmax', 'lttb', None):
+            raise ValueError(f"Unsupported downsampling method: {downsample}")
         self.analysis_tools = analysis_tools
-    
+        self.max_points = max_points
+        self.downsample = downsample
+        self.output_dir = output_dir
+        self.name = name
+        self.file_format = file_format
+        self.dpi = dpi
+        self._batch_figure = None
+
+    def _reduce(self, values):
+        '''
+        @purpose: To shrink a series to at most max_points points with the configured downsampling method.
+        @parameters:
+            - values: pd.Series, or any sequence (plotted against its position).
+        @return: The values to plot; a shorter pd.Series when downsampled, otherwise values unchanged.
+        '''
+        if self.downsample is None or len(values) <= self.max_points:
+            return values
+        series = values if isinstance(values, pd.Series) else pd.Series(np.asarray(values))
+        # NaNs (e.g. the warm-up of a moving average) would only draw gaps
+        series = series.dropna()
+        y = series.to_numpy(dtype=np.float64)
+        if self.downsample == 'minmax':
+            positions = minmax_indices(y, self.max_points)
+        else:
+            index = series.index
+            if isinstance(index, pd.DatetimeIndex):
+                x = index.asi8.astype(np.float64)
+            elif pd.api.types.is_numeric_dtype(index):
+                x = index.to_numpy(dtype=np.float64)
+            else:
+                x = np.arange(len(series), dtype=np.float64)
+            positions = lttb_indices(x, y, self.max_points)
+        return series.iloc[positions]
+
+    def _figure(self, figsize):
+        '''
+        @purpose: To create a figure: a pyplot figure when interactive; in batch mode one Agg figure outside pyplot, cleared and reused by every plot.
+        @return: matplotlib Figure
+        '''
+        if self.output_dir is None:
+            return plt.figure(figsize=figsize)
+        if self._batch_figure is None:
+            self._batch_figure = Figure()
+            FigureCanvasAgg(self._batch_figure)
+        self._batch_figure.clear()
+        self._batch_figure.set_size_inches(figsize)
+        return self._batch_figure
+
+    def close(self):
+        '''
+        @purpose: To release the reused batch mode figure.
+        '''
+        self._batch_figure = None
+
+    def _finish(self, figure, plot_name):
+        '''
+        @purpose: To show the figure, or in batch mode to save it to output_dir.
+        @return: Path of the saved file in batch mode, otherwise None.
+        '''
+        if self.output_dir is None:
+            plt.show()
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        file_name = f"{self.name}_{plot_name}" if self.name else plot_name
+        path = os.path.join(self.output_dir, f"{file_name}.{self.file_format}")
+        figure.savefig(path, dpi=self.dpi)
+        return path
+
+    @instrumented
     def plot_price_with_moving_averages(self, window_short=50, window_long=200):
         '''
         @purpose: To plot closing prices with short-term and long-term moving averages.
         @parameters: 
             - Window size for short-term moving average. Defaults to 50.
             - Window size for long-term moving average. Defaults to 200.
-        @return: A plot of closing prices with moving averages.
+        @return: A plot of closing prices with moving averages (the file path in batch mode).
         '''
         rolling_stats_short = self.analysis_tools.calculate_rolling_statistics(window=window_short, metrics=['mean'])
         rolling_stats_long = self.analysis_tools.calculate_rolling_statistics(window=window_long, metrics=['mean'])
-        
-        plt.figure(figsize=(14, 8))
-        plt.plot(self.analysis_tools.data['close'], label='Closing Price')
-        plt.plot(rolling_stats_short['Rolling_Mean'], label=f'{window_short}-day MA')
-        plt.plot(rolling_stats_long['Rolling_Mean'], label=f'{window_long}-day MA')
-        plt.title('Stock Price with Moving Averages')
-        plt.xlabel('Date')
-        plt.ylabel('Price')
-        plt.legend()
-        plt.show()
+        return self._plot_price(rolling_stats_short['Rolling_Mean'], rolling_stats_long['Rolling_Mean'],
+                                window_short, window_long)
+
+    def _plot_price(self, moving_average_short, moving_average_long, window_short, window_long):
+        figure = self._figure(figsize=(14, 8))
+        ax = figure.add_subplot()
+        ax.plot(self._reduce(self.analysis_tools.data['close']), label='Closing Price')
+        ax.plot(self._reduce(moving_average_short), label=f'{window_short}-day MA')
+        ax.plot(self._reduce(moving_average_long), label=f'{window_long}-day MA')
+        ax.set_title('Stock Price with Moving Averages')
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Price')
+        ax.legend()
+        return self._finish(figure, 'price_with_moving_averages')
     
+    @instrumented
     def plot_volatility(self, atr_window=14, analysis_tools=None):
         '''
         @purpose: To plot the 0ATR for volatility.
         @parameters: 
             - Window size for ATR calculation. Defaults to 14.
-        @return: plot 
+        @return: plot (the file path in batch mode)
         '''
         
         if analysis_tools is None:
@@ -39,63 +189,80 @@ class VisualizationModule:
         
         atr = analysis_tools.calculate_volatility(method='atr', window=atr_window)
         
-        plt.figure(figsize=(14, 6))
-        plt.plot(atr, label='ATR (Volatility)')
-        plt.title('Volatility (ATR)')
-        plt.xlabel('Date')
-        plt.ylabel('ATR')
-        plt.legend()
-        plt.show()
+        figure = self._figure(figsize=(14, 6))
+        ax = figure.add_subplot()
+        ax.plot(self._reduce(atr), label='ATR (Volatility)')
+        ax.set_title('Volatility (ATR)')
+        ax.set_xlabel('Date')
+        ax.set_ylabel('ATR')
+        ax.legend()
+        return self._finish(figure, 'volatility')
     
+    @instrumented
     def plot_rate_of_change(self, period=10, analysis_tools=None):
         '''
         @purpose: To plot the RoC for a specified period.
         @parameters: 
             - Number of periods for calculating the RoC. Defaults to 10.
             - Statssummaries object. Defaults to None.
-        @return: A plot 
+        @return: A plot (the file path in batch mode)
         '''
         if analysis_tools is None:
             analysis_tools = self.analysis_tools  
         
         roc = analysis_tools.calculate_rate_of_change(period=period)
         
-        plt.figure(figsize=(14, 6))
-        plt.plot(roc, label=f'Rate of Change (%) - {period} periods')
-        plt.title(f'Rate of Change (Period={period})')
-        plt.xlabel('Date')
-        plt.ylabel('RoC (%)')
-        plt.legend()
-        plt.show()
+        figure = self._figure(figsize=(14, 6))
+        ax = figure.add_subplot()
+        ax.plot(self._reduce(roc), label=f'Rate of Change (%) - {period} periods')
+        ax.set_title(f'Rate of Change (Period={period})')
+        ax.set_xlabel('Date')
+        ax.set_ylabel('RoC (%)')
+        ax.legend()
+        return self._finish(figure, 'rate_of_change')
     
+    @instrumented
     def plot_seasonal_decomposition(self, freq=12, analysis_tools=None):
         '''
         @purpose: To plot the trend, seasonal, and residual components 
         @parameters: 
             - Frequency for seasonal decomposition. Defaults to 12.
             - Statssummaries object. Defaults to None.
-        @return: plots 
+        @return: plots (the file path in batch mode)
         '''
         if analysis_tools is None:
             analysis_tools = self.analysis_tools 
         decomposition = analysis_tools.simple_seasonal_decomposition(freq=freq)
         
-        plt.figure(figsize=(14, 10))
-        plt.subplot(3, 1, 1)
-        plt.plot(decomposition['trend'], label='Trend')
-        plt.title('Trend')
-        plt.legend()
-        
-        plt.subplot(3, 1, 2)
-        plt.plot(decomposition['seasonal'], label='Seasonal')
-        plt.title('Seasonal')
-        plt.legend()
+        figure = self._figure(figsize=(14, 10))
+        for position, (component, title) in enumerate([('trend', 'Trend'), ('seasonal', 'Seasonal'),
+                                                       ('residual', 'Residual')], start=1):
+            ax = figure.add_subplot(3, 1, position)
+            ax.plot(self._reduce(decomposition[component]), label=title)
+            ax.set_title(title)
+            ax.legend()
         
-        plt.subplot(3, 1, 3)
-        plt.plot(decomposition['residual'], label='Residual')
-        plt.title('Residual')
-        plt.legend()
-        
-        plt.tight_layout()
-        plt.show()
+        figure.tight_layout()
+        return self._finish(figure, 'seasonal_decomposition')
+
+    @instrumented
+    def plot_dashboard(self, window_short=50, window_long=200, atr_window=14, period=10, freq=12):
+        '''
+        @purpose: To draw all four plots, computing both moving averages in one rolling_sweep pass.
+        @parameters: 
+            - Window sizes of the moving averages. Default to 50 and 200.
+            - Window size for ATR calculation. Defaults to 14.
+            - Number of periods for calculating the RoC. Defaults to 10.
+            - Frequency for seasonal decomposition. Defaults to 12.
+        @return: dict of plot name to its file path in batch mode (None when shown).
+        '''
+        windows = list(dict.fromkeys([window_short, window_long]))
+        moving_averages = self.analysis_tools.rolling_sweep(windows, metrics=['mean'])['Rolling_Mean']
+        return {
+            'price_with_moving_averages': self._plot_price(moving_averages[window_short], moving_averages[window_long],
+                                                           window_short, window_long),
+            'volatility': self.plot_volatility(atr_window=atr_window),
+            'rate_of_change': self.plot_rate_of_change(period=period),
+            'seasonal_decomposition': self.plot_seasonal_decomposition(freq=freq),
+        }
 
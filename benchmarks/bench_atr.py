@@ -0,0 +1,82 @@
+"""
+Benchmark the true range / ATR kernels against the previous implementation, which built three Series, concatenated
+them and took the row-wise max before a rolling mean, on synthetic one-minute bars shaped like 000001.csv.
+The 2-D case computes ATR for many symbols at once against looping the previous implementation per symbol.
+
+usage: python benchmarks/bench_atr.py --rows 10000000 --symbols 500 --symbol-rows 20000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from kernels import average_true_range
+from Statssummaries import Statssummaries
+from suite import make_frame
+
+
+def legacy_atr(data, window, price_column='close'):
+    """
+    ATR as calculate_volatility(method='atr') computed it before the kernels
+    """
+    prev_close = data[price_column].shift()
+    high_low = data['high'] - data['low']
+    high_close = np.abs(data['high'] - prev_close)
+    low_close = np.abs(data['low'] - prev_close)
+    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    return true_range.rolling(window).mean()
+
+
+def measure(fn):
+    """
+    returns: (wall time in seconds, tracemalloc peak in bytes, result)
+    """
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak_bytes, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--symbol-rows", type=int, default=20000)
+    parser.add_argument("--window", type=int, default=14)
+    args = parser.parse_args()
+
+    data = make_frame(args.rows)
+    legacy_time, legacy_peak, expected = measure(lambda: legacy_atr(data, args.window))
+    stats = Statssummaries(data, cache_size=0)
+    new_time, new_peak, result = measure(lambda: stats.calculate_volatility(method='atr', window=args.window))
+    wilder_time, _, _ = measure(lambda: stats.calculate_volatility(method='atr', window=args.window, smoothing='wilder'))
+    error = np.nanmax(np.abs(result.to_numpy() - expected.to_numpy()))
+    print(f"{args.rows} rows, window={args.window}")
+    print(f"previous (concat + max + rolling): {legacy_time:.3f} s, peak {legacy_peak / 2 ** 20:.0f} MiB")
+    print(f"kernels, sma:                      {new_time:.3f} s, peak {new_peak / 2 ** 20:.0f} MiB "
+          f"({legacy_time / new_time:.1f}x faster, max |diff| {error:.1e})")
+    print(f"kernels, wilder:                   {wilder_time:.3f} s")
+
+    frames = [make_frame(args.symbol_rows, seed=seed) for seed in range(args.symbols)]
+    high, low, close = (np.column_stack([frame[column].to_numpy() for frame in frames])
+                        for column in ['high', 'low', 'close'])
+    out = np.empty_like(close)
+    legacy_time, _, _ = measure(lambda: [legacy_atr(frame, args.window) for frame in frames])
+    new_time, new_peak, _ = measure(lambda: average_true_range(high, low, close, args.window, out=out))
+    print(f"{args.symbols} symbols x {args.symbol_rows} rows")
+    print(f"previous, one symbol at a time:    {legacy_time:.3f} s")
+    print(f"kernels, 2-D with out=:            {new_time:.3f} s, peak {new_peak / 2 ** 20:.0f} MiB "
+          f"({legacy_time / new_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark the cost of the instrumented decorator outside an instrument() block: the same trivial method is
+timed plain and wrapped, and the difference per call is reported.
+
+usage: python benchmarks/bench_instrumentation.py --calls 200000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import instrumented
+
+
+class Plain:
+    data = None
+
+    def method(self):
+        return 1
+
+
+class Wrapped(Plain):
+    method = instrumented(Plain.method)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    plain, wrapped = Plain(), Wrapped()
+    plain_time = min(timeit.repeat(plain.method, number=args.calls, repeat=args.repeat))
+    wrapped_time = min(timeit.repeat(wrapped.method, number=args.calls, repeat=args.repeat))
+
+    print(f"{args.calls} calls, best of {args.repeat}")
+    print(f"plain method:        {plain_time / args.calls * 1e9:.0f} ns per call")
+    print(f"instrumented, off:   {wrapped_time / args.calls * 1e9:.0f} ns per call")
+    print(f"overhead:            {(wrapped_time - plain_time) / args.calls * 1e9:.0f} ns per call")
+
+
+if __name__ == "__main__":
+    main()
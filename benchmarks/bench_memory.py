@@ -0,0 +1,80 @@
+"""
+Measure the tracemalloc peak of building a Statssummaries report on a synthetic series shaped like
+000001.csv: the previous copy + copy/join/fillna path against copy=False and summary(out=...),
+both for a fresh analysis and for a repeated report whose metrics are already memoized.
+
+usage: python benchmarks/bench_memory.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Statssummaries import Statssummaries
+from bench_sweep import make_series
+
+
+def legacy_summary(stats):
+    """
+    summary() before out= existed: copy + join + fillna of the whole frame
+    """
+    summary = stats.data.copy()
+    summary = summary.join(stats.calculate_rolling_statistics(20, metrics=['mean', 'std']))
+    summary['Rate_of_Change(%)'] = stats.calculate_rate_of_change(10)
+    summary['ATR'] = stats.calculate_volatility(method='atr', window=14)
+    summary.fillna(0, inplace=True)
+    return summary
+
+
+def peak(fn):
+    """
+    returns: (result, peak bytes allocated while fn ran)
+    """
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    result = fn()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    data = make_series(args.rows)
+    columns = ['Rolling_Mean', 'Rolling_Std', 'Rate_of_Change(%)', 'ATR']
+    buffers = {name: np.empty(args.rows) for name in columns}
+
+    cases = [
+        ("copy + join + fillna (previous)", lambda: legacy_summary(Statssummaries(data))),
+        ("copy=True, summary()", lambda: Statssummaries(data).summary()),
+        ("copy=False, summary()", lambda: Statssummaries(data, copy=False).summary()),
+        ("copy=False, summary(out=dict)", lambda: Statssummaries(data, copy=False).summary(out=buffers)),
+    ]
+    frame_bytes = data.memory_usage().sum()
+    print(f"{args.rows} rows, input frame {frame_bytes / 2 ** 20:.1f} MiB")
+    baseline = None
+    for label, fn in cases:
+        _, peak_bytes = peak(fn)
+        baseline = baseline or peak_bytes
+        print(f"{label:32s} peak {peak_bytes / 2 ** 20:8.1f} MiB ({peak_bytes / frame_bytes:.2f}x input, "
+              f"{baseline / peak_bytes:.2f}x less than previous)")
+
+    # a repeated report on a warm analysis: the metrics are memoized, so only the output is allocated
+    stats = Statssummaries(data, copy=False)
+    stats.summary()
+    print("repeated report, metrics memoized")
+    for label, fn in [("copy + join + fillna (previous)", lambda: legacy_summary(stats)),
+                      ("summary()", lambda: stats.summary()),
+                      ("summary(out=dict)", lambda: stats.summary(out=buffers))]:
+        _, peak_bytes = peak(fn)
+        print(f"{label:32s} peak {peak_bytes / 2 ** 20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
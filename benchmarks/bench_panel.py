@@ -0,0 +1,62 @@
+"""
+Benchmark PanelStatssummaries.summary() against a per-symbol Statssummaries.summary() loop
+on a synthetic panel shaped like 000001.csv (date, close, high, low, open, volume).
+
+usage: python benchmarks/bench_panel.py --symbols 5000 --rows 250
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Statssummaries import Statssummaries, PanelStatssummaries
+
+
+def make_panel(n_symbols, n_rows, seed=0):
+    """
+    build a long-format panel with n_rows daily bars for each of n_symbols symbols
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1991-01-02", periods=n_rows, freq="D")
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_symbols, n_rows)), axis=1))
+    spread = np.abs(rng.normal(0, 0.01, (n_symbols, n_rows))) * close
+    panel = pd.DataFrame({
+        "symbol": np.repeat([f"{i:06d}" for i in range(n_symbols)], n_rows),
+        "close": close.ravel(),
+        "high": (close + spread).ravel(),
+        "low": (close - spread).ravel(),
+        "open": np.roll(close, 1, axis=1).ravel(),
+        "volume": rng.uniform(100, 1000, n_symbols * n_rows),
+    }, index=pd.DatetimeIndex(np.tile(dates, n_symbols), name="date"))
+    return panel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=5000)
+    parser.add_argument("--rows", type=int, default=250)
+    args = parser.parse_args()
+
+    panel = make_panel(args.symbols, args.rows)
+
+    start = time.perf_counter()
+    batch = PanelStatssummaries(panel, price_column="close").summary()
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _, frame in panel.groupby("symbol", sort=True):
+        Statssummaries(frame.drop(columns="symbol"), price_column="close").summary()
+    loop_time = time.perf_counter() - start
+
+    print(f"panel: {args.symbols} symbols x {args.rows} rows ({len(panel)} rows)")
+    print(f"per-symbol loop: {loop_time:.3f} s")
+    print(f"panel summary:   {batch_time:.3f} s ({loop_time / batch_time:.1f}x faster)")
+    print(f"output rows:     {len(batch)}")
+
+
+if __name__ == "__main__":
+    main()
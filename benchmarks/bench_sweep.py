@@ -0,0 +1,63 @@
+"""
+Benchmark Statssummaries.rolling_sweep() against one calculate_rolling_statistics /
+calculate_volatility call per window on a synthetic series shaped like 000001.csv.
+
+usage: python benchmarks/bench_sweep.py --rows 100000 --min-window 5 --max-window 250
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Statssummaries import Statssummaries
+
+
+def make_series(n_rows, seed=0):
+    """
+    build a daily OHLCV random walk with n_rows bars
+    """
+    rng = np.random.default_rng(seed)
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, n_rows)))
+    spread = np.abs(rng.normal(0, 0.01, n_rows)) * close
+    return pd.DataFrame({
+        "close": close,
+        "high": close + spread,
+        "low": close - spread,
+        "open": np.roll(close, 1),
+        "volume": rng.uniform(100, 1000, n_rows),
+    }, index=pd.date_range("1991-01-02", periods=n_rows, freq="D", name="date"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--min-window", type=int, default=5)
+    parser.add_argument("--max-window", type=int, default=250)
+    args = parser.parse_args()
+
+    data = make_series(args.rows)
+    windows = list(range(args.min_window, args.max_window + 1))
+
+    # cache_size=0 so the naive loop pays for every window like a fresh analysis would
+    stats = Statssummaries(data, price_column="close", cache_size=0)
+    start = time.perf_counter()
+    for window in windows:
+        stats.calculate_rolling_statistics(window=window, metrics=["mean", "std"])
+        stats.calculate_volatility(method="atr", window=window)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sweep = stats.rolling_sweep(windows, metrics=["mean", "std", "atr"])
+    sweep_time = time.perf_counter() - start
+
+    print(f"{args.rows} rows, {len(windows)} windows, metrics mean/std/atr ({sweep.shape[1]} columns)")
+    print(f"loop over windows: {loop_time:.3f} s")
+    print(f"rolling_sweep:     {sweep_time:.3f} s ({loop_time / sweep_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
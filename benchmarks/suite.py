@@ -0,0 +1,198 @@
+"""
+Benchmark suite for the hot paths of DataProcessor, Statssummaries and VisualizationModule.
+
+Synthetic one-minute bars with the columns of 000001.csv are generated at each size, every benchmark is
+timed (best of --repeat runs) and then run once more under tracemalloc for its peak memory. Results are
+written as JSON and, with --baseline, compared against an earlier run: a benchmark regresses when its time
+or peak memory grows by more than --threshold (a fraction), and the exit status is then 1.
+
+usage: python benchmarks/suite.py --sizes 10000 100000 1000000 --output results.json
+       python benchmarks/suite.py --baseline baseline.json --threshold 0.25
+       python benchmarks/suite.py --sizes 100000000 --max-load-rows 0 --max-plot-rows 0   (needs ~40 GB of RAM)
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from processor import DataProcessor
+from Statssummaries import Statssummaries
+from Visualization import VisualizationModule
+
+SCHEMA_FILE = os.path.join(ROOT, "000001.csv")
+
+# writer of every format DataProcessor.load_data reads; formats whose writer dependency is missing are skipped
+WRITERS = {
+    "csv": lambda frame, path: frame.to_csv(path),
+    "jsonl": lambda frame, path: frame.reset_index().to_json(path, orient="records", lines=True, date_format="iso"),
+    "parquet": lambda frame, path: frame.to_parquet(path),
+    "xlsx": lambda frame, path: frame.to_excel(path),
+    "hdf5": lambda frame, path: frame.to_hdf(path, key="data"),
+}
+EXCEL_MAX_ROWS = 1048575
+
+
+def make_frame(n_rows, freq="min", seed=0):
+    """
+    build n_rows OHLCV bars with the columns, index name and price/volume scale of 000001.csv
+    parameters: n_rows - number of bars
+    freq - bar frequency (default is one minute, so 10^8 rows still fit in the Timestamp range)
+    seed - random seed
+    returns: pd.DataFrame
+    """
+    sample = pd.read_csv(SCHEMA_FILE, index_col=0, parse_dates=True)
+    rng = np.random.default_rng(seed)
+    close = sample["close"].iloc[-1] * np.exp(np.cumsum(rng.normal(0, 0.001, n_rows)))
+    open_ = np.concatenate([close[:1], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0005, n_rows)) * close
+    volume = rng.lognormal(np.log(sample["volume"].median()), 1.0, n_rows)
+    columns = {"close": close, "high": np.maximum(open_, close) + spread, "low": np.minimum(open_, close) - spread,
+               "open": open_, "volume": volume}
+    index = pd.date_range(sample.index[0], periods=n_rows, freq=freq, name=sample.index.name)
+    return pd.DataFrame({column: columns[column] for column in sample.columns}, index=index)
+
+
+def measure(fn, repeat):
+    """
+    returns: (best wall time over repeat runs in seconds, tracemalloc peak of one more run in bytes)
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak_bytes
+
+
+def plot_price(stats):
+    """
+    render plot_price_with_moving_averages off-screen, including the draw that plt.show() would trigger
+    """
+    VisualizationModule(stats.data, stats).plot_price_with_moving_averages()
+    plt.gcf().canvas.draw()
+    plt.close("all")
+
+
+def benchmarks(frame, directory, max_load_rows, max_plot_rows):
+    """
+    yield (name, callable) for every benchmark that applies at this size
+    """
+    n_rows = len(frame)
+    if n_rows <= max_load_rows:
+        for file_format, write in WRITERS.items():
+            if file_format == "xlsx" and n_rows > EXCEL_MAX_ROWS:
+                continue
+            path = os.path.join(directory, f"data.{file_format}")
+            try:
+                write(frame, path)
+            except ImportError as error:
+                print(f"  skip load_data[{file_format}]: {str(error).splitlines()[0]}")
+                continue
+            yield f"load_data[{file_format}]", lambda path=path, fmt=file_format: DataProcessor(path, fmt).load_data()
+
+    processor = DataProcessor(SCHEMA_FILE)
+    processor.data = frame
+    stats = Statssummaries(frame, cache_size=0)  # nothing memoized, every run does the full work
+    yield "resample_data", lambda: processor.resample_data("D", "mean")
+    yield "detect_outliers[zscore]", lambda: processor.detect_outliers("close", method="zscore")
+    yield "detect_outliers[iqr]", lambda: processor.detect_outliers("close", method="iqr")
+    yield "clean_outliers[clip]", lambda: processor.clean_outliers(method="zscore", action="clip")
+    yield "calculate_rolling_statistics", lambda: stats.calculate_rolling_statistics(20, ["mean", "median", "std"])
+    yield "summary", lambda: stats.summary()
+    yield "simple_seasonal_decomposition", lambda: stats.simple_seasonal_decomposition(freq=12)
+    if n_rows <= max_plot_rows:
+        yield "plot_price_with_moving_averages", lambda: plot_price(stats)
+
+
+def run(sizes, repeat, max_load_rows, max_plot_rows):
+    """
+    returns: list of result records (name, rows, seconds, rows_per_second, peak_bytes)
+    """
+    results = []
+    directory = tempfile.mkdtemp(prefix="bench-suite-")
+    try:
+        for n_rows in sizes:
+            print(f"{n_rows} rows")
+            frame = make_frame(n_rows)
+            for name, fn in benchmarks(frame, directory, max_load_rows, max_plot_rows):
+                seconds, peak_bytes = measure(fn, repeat)
+                results.append({"name": name, "rows": n_rows, "seconds": seconds,
+                                "rows_per_second": n_rows / seconds, "peak_bytes": peak_bytes})
+                print(f"  {name:32s} {seconds * 1000:10.2f} ms {n_rows / seconds:14,.0f} rows/s "
+                      f"{peak_bytes / 2 ** 20:10.1f} MiB")
+            del frame
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    compare results with a baseline run
+    returns: list of (name, rows, metric, baseline value, current value) for every regression
+    """
+    previous = {(record["name"], record["rows"]): record for record in baseline["results"]}
+    regressions = []
+    for record in results:
+        before = previous.get((record["name"], record["rows"]))
+        if before is None:
+            continue
+        for metric in ["seconds", "peak_bytes"]:
+            if before[metric] > 0 and record[metric] > before[metric] * (1 + threshold):
+                regressions.append((record["name"], record["rows"], metric, before[metric], record[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-load-rows", type=int, default=1000000, help="largest size written to files for load_data")
+    parser.add_argument("--max-plot-rows", type=int, default=1000000, help="largest size rendered by the plot benchmark")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown / memory growth")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.max_load_rows, args.max_plot_rows)
+    report = {
+        "meta": {"created": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "pandas": pd.__version__, "numpy": np.__version__, "machine": platform.platform(),
+                 "cpu_count": os.cpu_count(), "repeat": args.repeat},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, rows, metric, before, after in regressions:
+            print(f"REGRESSION {name} @ {rows} rows: {metric} {before:.6g} -> {after:.6g} ({after / before - 1:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions above {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+
+class DatasetCache:
+    """
+    on-disk cache of parsed DataFrames, stored as one .npy file per column plus the index
+    so a later load is a memory map instead of a text parse
+    """
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 ** 3):
+        """
+        initialize the cache in a directory
+        parameters: cache_dir - directory holding the cache entries (created if missing)
+        max_bytes - total size above which least recently used entries are evicted (default is 2 GiB)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, file_path: str, **options):
+        """
+        build the cache key of a source file; it changes whenever the file's mtime or size
+        or one of the load options changes, so stale entries are never served
+        parameters: file_path - path to the data file
+        options - load options that affect the parsed result (e.g. file_format)
+        returns: str - hex digest identifying the entry
+        """
+        stat = os.stat(file_path)
+        payload = [os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, options]
+        return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str):
+        """
+        load a cached frame with its columns memory-mapped (copy-on-write, the files are never modified)
+        parameters: key - cache key from make_key
+        returns: pd.DataFrame or None on a miss
+        """
+        entry = os.path.join(self.cache_dir, key)
+        meta_path = os.path.join(entry, "meta.json")
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["index"]["kind"] == "range":
+                index = pd.RangeIndex(*meta["index"]["range"], name=meta["index"]["name"])
+            else:
+                index = pd.Index(self._map(os.path.join(entry, "index.npy")), name=meta["index"]["name"])
+            columns = {name: self._map(os.path.join(entry, f"column_{i}.npy"))
+                       for i, name in enumerate(meta["columns"])}
+            os.utime(meta_path)  # last access time drives eviction
+        except FileNotFoundError:
+            # missing, or removed by another process while it was read
+            self.misses += 1
+            return None
+        frame = pd.DataFrame(columns, index=index, copy=False)
+        frame.columns.name = meta["columns_name"]
+        self.hits += 1
+        return frame
+
+    def put(self, key: str, frame: pd.DataFrame, source: str = None):
+        """
+        store a frame; frames with object, extension or tz-aware columns are not cached
+        parameters: key - cache key from make_key
+        frame - the parsed DataFrame
+        source - path of the source file; older entries of the same source are removed
+        returns: bool - whether the frame was stored
+        """
+        if not self._is_cacheable(frame):
+            return False
+
+        tmp = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        if isinstance(frame.index, pd.RangeIndex):
+            index = {"kind": "range", "range": [frame.index.start, frame.index.stop, frame.index.step]}
+        else:
+            index = {"kind": "array"}
+            np.save(os.path.join(tmp, "index.npy"), frame.index.to_numpy())
+        index["name"] = frame.index.name
+        for i in range(frame.shape[1]):
+            np.save(os.path.join(tmp, f"column_{i}.npy"), np.ascontiguousarray(frame.iloc[:, i].to_numpy()))
+        meta = {"columns": list(frame.columns), "columns_name": frame.columns.name, "index": index,
+                "source": os.path.abspath(source) if source else None}
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        if source:
+            for other in self._entries():
+                if other != key and (self._read_meta(other) or {}).get("source") == meta["source"]:
+                    self._remove(other)
+        self._remove(key)
+        try:
+            os.rename(tmp, os.path.join(self.cache_dir, key))  # atomic, readers never see a half-written entry
+        except OSError:
+            # another process stored the same key in the meantime; its entry is identical
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+        return True
+
+    def evict(self):
+        """
+        remove least recently used entries until the cache fits in max_bytes
+        returns: list - removed keys
+        """
+        # entries removed by another process meanwhile are skipped
+        times = {}
+        for key in self._entries():
+            try:
+                times[key] = os.path.getmtime(os.path.join(self.cache_dir, key, "meta.json"))
+            except FileNotFoundError:
+                pass
+        entries = sorted(times, key=times.get)
+        sizes = {key: self._entry_size(key) for key in entries}
+        total = sum(sizes.values())
+        removed = []
+        for key in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= sizes[key]
+            removed.append(key)
+        return removed
+
+    def clear(self):
+        """
+        remove every entry and reset the counters
+        """
+        for key in self._entries():
+            self._remove(key)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        returns: dict - hits, misses, number of entries and their total size in bytes
+        """
+        entries = self._entries()
+        return {"hits": self.hits, "misses": self.misses, "entries": len(entries),
+                "bytes": sum(self._entry_size(key) for key in entries)}
+
+    @staticmethod
+    def _map(path):
+        # plain ndarray view of the memory map, so pandas treats it like any other column
+        return np.asarray(np.load(path, mmap_mode="c"))
+
+    @staticmethod
+    def _is_cacheable(frame):
+        for dtype in list(frame.dtypes) + [frame.index.dtype]:
+            if not isinstance(dtype, np.dtype) or dtype.kind not in "biufcmM":
+                return False
+        return all(isinstance(name, (str, int)) for name in frame.columns)
+
+    # several processes may share the directory, so any entry can disappear between two steps of a scan
+
+    def _entries(self):
+        return [name for name in os.listdir(self.cache_dir)
+                if os.path.exists(os.path.join(self.cache_dir, name, "meta.json")) and not name.startswith(".")]
+
+    def _read_meta(self, key):
+        try:
+            with open(os.path.join(self.cache_dir, key, "meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _entry_size(self, key):
+        entry = os.path.join(self.cache_dir, key)
+        size = 0
+        try:
+            names = os.listdir(entry)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            try:
+                size += os.path.getsize(os.path.join(entry, name))
+            except FileNotFoundError:
+                pass
+        return size
+
+    def _remove(self, key):
+        # renamed out of the way first, so a reader never finds an entry with some of its files deleted
+        doomed = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.rename(os.path.join(self.cache_dir, key), doomed)
+        except FileNotFoundError:
+            return
+        shutil.rmtree(doomed, ignore_errors=True)
@@ -0,0 +1,176 @@
+import cProfile
+import functools
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# active sinks; the decorator only checks this list when nothing is being instrumented
+_sinks = []
+_local = threading.local()
+
+
+def instrumented(func):
+    """
+    decorator recording wall time, rows processed and memory delta of a method call to the active sinks
+    parameters: func - method of an object holding its data in `data` (or in `analysis_tools.data`)
+    returns: wrapped method; while no instrument() block is active it only adds one list check per call
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not _sinks:
+            return func(self, *args, **kwargs)
+
+        depth = getattr(_local, "depth", 0)
+        _local.depth = depth + 1
+        memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        error = None
+        start = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        except BaseException as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            _local.depth = depth
+            record = {
+                "name": func.__qualname__,
+                "seconds": seconds,
+                "rows": _rows(self),
+                "memory_delta": tracemalloc.get_traced_memory()[0] - memory if memory is not None else None,
+                "depth": depth,
+                "timestamp": time.time(),
+                "error": error,
+            }
+            for sink in list(_sinks):
+                sink.record(record)
+    return wrapper
+
+
+def _rows(instance):
+    data = getattr(instance, "data", None)
+    if data is None:
+        data = getattr(getattr(instance, "analysis_tools", None), "data", None)
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+@contextmanager
+def instrument(*sinks, trace_memory: bool = False):
+    """
+    record every instrumented call made inside the block
+    parameters: sinks - objects with open(), record(record) and close() (default is one MemorySink)
+    trace_memory - start tracemalloc for the block so records carry a memory delta (default is False,
+    the delta is then only reported when tracemalloc is already tracing)
+    returns: the first sink
+    """
+    sinks = list(sinks) or [MemorySink()]
+    started = trace_memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    for sink in sinks:
+        sink.open()
+    _sinks.extend(sinks)
+    try:
+        yield sinks[0]
+    finally:
+        for sink in sinks:
+            _sinks.remove(sink)
+            sink.close()
+        if started:
+            tracemalloc.stop()
+
+
+class MemorySink:
+    """
+    keeps the records in a list and aggregates them per method
+    """
+    def __init__(self):
+        self.records = []
+
+    def open(self):
+        pass
+
+    def record(self, record):
+        self.records.append(record)
+
+    def close(self):
+        pass
+
+    def stats(self):
+        """
+        returns: dict - per method name: calls, total_seconds, mean_seconds, max_seconds, rows (of the last call)
+        and total_memory_delta (None without memory tracing)
+        """
+        stats = {}
+        for record in self.records:
+            entry = stats.setdefault(record["name"], {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                                                      "rows": None, "total_memory_delta": None})
+            entry["calls"] += 1
+            entry["total_seconds"] += record["seconds"]
+            entry["max_seconds"] = max(entry["max_seconds"], record["seconds"])
+            entry["rows"] = record["rows"]
+            if record["memory_delta"] is not None:
+                entry["total_memory_delta"] = (entry["total_memory_delta"] or 0) + record["memory_delta"]
+        for entry in stats.values():
+            entry["mean_seconds"] = entry["total_seconds"] / entry["calls"]
+        return stats
+
+
+class JsonLinesSink:
+    """
+    appends one JSON object per call to a file
+    """
+    def __init__(self, path: str):
+        """
+        parameters: path - log file, opened in append mode for the duration of the instrument() block
+        """
+        self.path = path
+        self._file = None
+
+    def open(self):
+        self._file = open(self.path, "a")
+
+    def record(self, record):
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self._file.close()
+        self._file = None
+
+
+class ProfileSink:
+    """
+    runs cProfile for the whole instrument() block, so the per-call records can be broken down by function
+    """
+    def __init__(self, path: str = None):
+        """
+        parameters: path - file the profile is dumped to on close, readable by pstats and snakeviz (default is None)
+        """
+        self.path = path
+        self.profile = cProfile.Profile()
+
+    def open(self):
+        self.profile.enable()
+
+    def record(self, record):
+        pass
+
+    def close(self):
+        self.profile.disable()
+        if self.path is not None:
+            self.profile.dump_stats(self.path)
+
+    def report(self, sort: str = "cumulative", limit: int = 20):
+        """
+        returns: str - the pstats table of the top functions
+        """
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
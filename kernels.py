@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+
+def true_range(high, low, close, out=None):
+    """
+    True range max(high - low, |high - previous close|, |low - previous close|) along axis 0.
+    Terms that are NaN are skipped (np.fmax), like DataFrame.max(axis=1), so the first row is high - low.
+    Beyond out only one scratch array of the input's shape is allocated.
+    :param high: 1-D array (rows) or 2-D array (rows, symbols).
+    :param low: Array of the same shape.
+    :param close: Array of the same shape.
+    :param out: Optional float64 array of the same shape receiving the result.
+    :return: out, or a new float64 array.
+    """
+    high, low, close = (np.asarray(values, dtype=np.float64) for values in (high, low, close))
+    if out is None:
+        out = np.empty(high.shape)
+    np.subtract(high, low, out=out)
+    if len(out) < 2:
+        return out
+    scratch = np.empty(out[1:].shape)
+    for extreme in (high, low):
+        np.subtract(extreme[1:], close[:-1], out=scratch)
+        np.abs(scratch, out=scratch)
+        np.fmax(out[1:], scratch, out=out[1:])
+    return out
+
+
+def smooth_true_range(tr, window, smoothing='sma', out=None):
+    """
+    Average true range of a true range array along axis 0.
+    'sma' is the simple moving average of the last window rows (as Series.rolling(window).mean()): one cumulative
+    sum of the true range around its column mean, so the differences stay small on long series.
+    'wilder' is Wilder's smoothing atr = atr_prev + (tr - atr_prev) / window, seeded with the simple average of the
+    first window rows. The recursion runs in pandas' compiled ewm (alpha = 1 / window, adjust=False).
+    :param tr: 1-D or 2-D float array, e.g. from true_range.
+    :param window: Window size.
+    :param smoothing: 'sma' or 'wilder' (default is 'sma').
+    :param out: Optional float64 array of the shape of tr (may be tr itself).
+    :return: out, or a new array, NaN where the window is incomplete or (for 'sma') contains NaN.
+    """
+    if smoothing not in ('sma', 'wilder'):
+        raise ValueError(f"Unsupported smoothing: {smoothing}")
+    window = int(window)
+    if window < 1:
+        raise ValueError("Window must be a positive integer")
+    tr = np.asarray(tr, dtype=np.float64)
+    if out is None:
+        out = np.empty(tr.shape)
+    n = len(tr)
+    if window > n:
+        out[...] = np.nan
+        return out
+
+    missing = np.isnan(tr)
+    has_nan = missing.any()
+    if has_nan:
+        # windows with a missing value, counted before tr is overwritten when out is tr
+        missing_prefix = np.zeros((n + 1,) + tr.shape[1:], dtype=np.int64)
+        np.cumsum(missing, axis=0, out=missing_prefix[1:])
+        incomplete = missing_prefix[window:] - missing_prefix[:-window] > 0
+    centre = np.nanmean(tr, axis=0) if has_nan else tr.mean(axis=0)
+    centre = np.where(np.isnan(centre), 0.0, centre)
+
+    # sums of the first window rows (the 'wilder' seed) or of every window ('sma') from one prefix sum
+    prefix = np.zeros((n + 1,) + tr.shape[1:])
+    np.subtract(tr, centre, out=prefix[1:])
+    if has_nan:
+        prefix[1:][missing] = 0.0
+    np.cumsum(prefix[1:], axis=0, out=prefix[1:])
+    if smoothing == 'sma':
+        np.subtract(prefix[window:], prefix[:-window], out=out[window - 1:])
+        out[window - 1:] /= window
+        out[window - 1:] += centre
+        out[:window - 1] = np.nan
+        if has_nan:
+            out[window - 1:][incomplete] = np.nan
+        return out
+
+    seed = prefix[window] / window + centre
+    if has_nan:
+        seed = np.where(incomplete[0], np.nan, seed)
+    # the seed replaces the first window rows, so ewm starts from it
+    series = pd.DataFrame(tr.reshape(n, -1)[window - 1:], copy=True)
+    series.iloc[0] = np.ravel(seed)
+    smoothed = series.ewm(alpha=1.0 / window, adjust=False).mean().to_numpy()
+    out[window - 1:] = smoothed.reshape(out[window - 1:].shape)
+    out[:window - 1] = np.nan
+    return out
+
+
+def average_true_range(high, low, close, window, smoothing='sma', out=None):
+    """
+    Average true range of 1-D or 2-D (rows, symbols) arrays, computed in out without other full-size temporaries
+    than the ones of true_range and smooth_true_range.
+    :param window: Window size.
+    :param smoothing: 'sma' (simple moving average) or 'wilder' (default is 'sma').
+    :param out: Optional float64 array of the input's shape.
+    :return: out, or a new float64 array.
+    """
+    tr = true_range(high, low, close, out=out)
+    return smooth_true_range(tr, window, smoothing, out=tr)
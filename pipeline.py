@@ -0,0 +1,300 @@
+import glob
+import os
+import traceback
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from processor import DataProcessor
+from Statssummaries import Statssummaries
+from Visualization import VisualizationModule
+
+
+class PipelineResult:
+    """
+    results of a pipeline run, keyed by file path
+    """
+    def __init__(self):
+        self.results = {}
+        self.failures = {}
+
+    def __repr__(self):
+        return f"PipelineResult(succeeded={len(self.results)}, failed={len(self.failures)})"
+
+
+def process_file(file_path: str, file_format: str = "csv", price_column: str = "close",
+                 outlier_method: str = "zscore", outlier_threshold: float = 3.0, smooth_window: int = 5,
+                 rolling_window: int = 20, roc_period: int = 10, atr_window: int = 14):
+    """
+    run load_data -> detect_outliers -> smooth_data -> summary for a single file
+    parameters: file_path - path to the data file
+    file_format - format of the data file (default is 'csv')
+    price_column - the column used for outliers, smoothing and the summary (default is 'close')
+    the remaining parameters are passed to detect_outliers, smooth_data and summary
+    returns: pd.DataFrame - summary table with extra 'Outlier' and 'Smoothed' columns
+    """
+    processor = DataProcessor(file_path, file_format=file_format)
+    processor.load_data()
+    outliers = processor.detect_outliers(column=price_column, method=outlier_method, threshold=outlier_threshold)
+    smoothed = processor.smooth_data(column=price_column, window_size=smooth_window)
+
+    summary = Statssummaries(processor.data, price_column=price_column).summary(
+        rolling_window=rolling_window, roc_period=roc_period, atr_window=atr_window)
+    summary["Smoothed"] = smoothed.fillna(0)
+    summary["Outlier"] = outliers
+    return summary
+
+
+def resolve_sources(sources, pattern: str = "*.csv"):
+    """
+    expand a directory, a glob pattern or a list of those into a sorted list of file paths
+    parameters: sources - directory, glob pattern, file path or a list of them
+    pattern - file pattern used when a directory is given (default is '*.csv')
+    returns: list - file paths
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    paths = []
+    for source in sources:
+        source = os.fspath(source)
+        if os.path.isdir(source):
+            paths.extend(sorted(glob.glob(os.path.join(source, pattern))))
+        elif glob.has_magic(source):
+            paths.extend(sorted(glob.glob(source)))
+        else:
+            paths.append(source)
+    return paths
+
+
+def _file_stems(paths):
+    """
+    file names without extension, which name the outputs of each file
+    raises: ValueError if two paths share a stem, so their outputs would overwrite each other
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    seen = {}
+    for stem, path in zip(stems, paths):
+        if stem in seen:
+            raise ValueError(f"{seen[stem]} and {path} have the same name {stem}; their outputs would collide.")
+        seen[stem] = path
+    return stems
+
+
+def iter_chunk_outcomes(fn, chunks, args, n_workers: int, max_pending: int, name=None):
+    """
+    run fn(chunk, *args) for every chunk in a process pool, keeping at most max_pending chunks in flight, and
+    yield the (name, ok, payload) outcomes fn returns for the items of each chunk
+    a chunk whose worker fails (including a worker process that dies and breaks the pool) is reported as one failed
+    outcome per item; a broken pool fails every chunk in flight and is replaced by a fresh one, so the run goes on
+    parameters: fn - picklable worker entry point returning a list of (name, ok, payload)
+    chunks - iterable of lists of items
+    args - further arguments passed to fn
+    n_workers - number of worker processes
+    max_pending - the upper bound on submitted but unfinished chunks
+    name - callable giving the outcome name of an item (default is the item itself)
+    returns: iterator of (name, ok, payload) in completion order
+    """
+    name = name or (lambda item: item)
+    chunks = iter(chunks)
+    retry = []
+
+    def failed(chunk, error):
+        return [(name(item), False, error) for item in chunk]
+
+    while True:
+        executor = ProcessPoolExecutor(max_workers=n_workers)
+        pending = {}
+        broken = False
+        try:
+            while True:
+                while not broken and len(pending) < max_pending:
+                    chunk = retry.pop() if retry else next(chunks, None)
+                    if chunk is None:
+                        break
+                    try:
+                        pending[executor.submit(fn, chunk, *args)] = chunk
+                    except BrokenProcessPool:
+                        # never started, so it runs again in the next pool
+                        retry.append(chunk)
+                        broken = True
+                if not pending:
+                    break
+                # once the pool is broken every future in flight finishes with its error
+                done, _ = wait(pending, return_when=ALL_COMPLETED if broken else FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    try:
+                        outcomes = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        outcomes = failed(chunk, traceback.format_exc())
+                    except Exception:
+                        outcomes = failed(chunk, traceback.format_exc())
+                    yield from outcomes
+                if broken and not pending:
+                    break
+        finally:
+            executor.shutdown(cancel_futures=True)
+        if not broken:
+            return
+
+
+def _process_chunk(paths, output_dir, output_format, options):
+    """
+    worker entry point: process a chunk of files and report each one separately
+    """
+    outcomes = []
+    for path in paths:
+        try:
+            summary = process_file(path, **options)
+            if output_dir is not None:
+                stem = os.path.splitext(os.path.basename(path))[0]
+                target = os.path.join(output_dir, f"{stem}.{output_format}")
+                if output_format == "csv":
+                    summary.to_csv(target)
+                else:
+                    summary.to_parquet(target)
+                summary = target
+            outcomes.append((path, True, summary))
+        except Exception:
+            outcomes.append((path, False, traceback.format_exc()))
+    return outcomes
+
+
+def iter_pipeline(sources, n_workers: int = None, chunk_size: int = 1, max_pending: int = None,
+                  output_dir: str = None, output_format: str = "csv", pattern: str = "*.csv", **options):
+    """
+    run the per-file pipeline over many files in a process pool and yield each outcome as soon as its chunk is done,
+    so summaries can be consumed and dropped one at a time
+    parameters: see run_pipeline
+    returns: iterator of (path, ok, payload) in completion order, payload is the summary (or written path) when ok
+    and the traceback otherwise
+    """
+    if output_format not in ["csv", "parquet"]:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    paths = resolve_sources(sources, pattern=pattern)
+    if output_dir is not None:
+        # summaries are written as <stem>.<output_format>
+        _file_stems(paths)
+    n_workers = n_workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * n_workers
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+
+    if n_workers == 1:
+        for chunk in chunks:
+            yield from _process_chunk(chunk, output_dir, output_format, options)
+        return
+
+    yield from iter_chunk_outcomes(_process_chunk, chunks, (output_dir, output_format, options), n_workers,
+                                   max_pending)
+
+
+def run_pipeline(sources, n_workers: int = None, chunk_size: int = 1, max_pending: int = None,
+                 output_dir: str = None, output_format: str = "csv", pattern: str = "*.csv", **options):
+    """
+    run the per-file pipeline over many files in a process pool
+    every summary is kept in the result, so memory is only bounded when output_dir is set (results then hold the
+    written paths); use iter_pipeline to consume in-memory summaries as they arrive
+    parameters: sources - directory, glob pattern, file path or a list of them
+    n_workers - number of worker processes (default is os.cpu_count(); 1 runs in this process)
+    chunk_size - number of files handed to a worker per task (default is 1)
+    max_pending - number of chunks in flight at once (default is 2 * n_workers)
+    output_dir - write each summary to this directory instead of returning it (default is None)
+    output_format - 'csv' or 'parquet' for written summaries (default is 'csv')
+    pattern - file pattern used when a directory is given (default is '*.csv')
+    options - keyword arguments passed to process_file
+    returns: PipelineResult - summaries (or written paths) in results, tracebacks in failures
+    raises: ValueError if the output format is not supported, or two files share a name with output_dir set
+    """
+    result = PipelineResult()
+    for path, ok, payload in iter_pipeline(sources, n_workers, chunk_size, max_pending, output_dir, output_format,
+                                           pattern, **options):
+        if ok:
+            result.results[path] = payload
+        else:
+            result.failures[path] = payload
+    return result
+
+
+def _render_chunk(items, output_dir, image_format, options):
+    """
+    worker entry point: render the dashboards of a chunk of sources with one reused figure
+    """
+    options = dict(options)
+    plot_options = {key: options.pop(key) for key in ["window_short", "window_long", "atr_window", "period", "freq"]
+                    if key in options}
+    file_format = options.pop("file_format", "csv")
+    price_column = options.pop("price_column", "close")
+    module = VisualizationModule(None, None, output_dir=output_dir, file_format=image_format, **options)
+    outcomes = []
+    try:
+        for name, source in items:
+            try:
+                if isinstance(source, Statssummaries):
+                    stats = source
+                else:
+                    processor = DataProcessor(source, file_format=file_format)
+                    stats = Statssummaries(processor.load_data(), price_column=price_column, copy=False)
+                module.analysis_tools, module.name = stats, name
+                outcomes.append((name, True, module.plot_dashboard(**plot_options)))
+            except Exception:
+                outcomes.append((name, False, traceback.format_exc()))
+    finally:
+        module.close()
+    return outcomes
+
+
+def render_universe(sources, output_dir: str, n_workers: int = None, chunk_size: int = 1, max_pending: int = None,
+                    image_format: str = "png", pattern: str = "*.csv", **options):
+    """
+    render the price/moving average, ATR, RoC and seasonal decomposition charts of many tickers in a process pool
+    parameters: sources - dict of name -> Statssummaries, or a directory, glob pattern, file path or a list of them
+    (files are named by their stem)
+    output_dir - directory the charts are written to as <name>_<plot>.<image_format>
+    n_workers - number of worker processes (default is os.cpu_count(); 1 runs in this process)
+    chunk_size - number of tickers handed to a worker per task (default is 1)
+    max_pending - number of chunks in flight at once, bounding memory (default is 2 * n_workers)
+    image_format - 'png' or 'svg' (default is 'png')
+    pattern - file pattern used when a directory is given (default is '*.csv')
+    options - file_format and price_column for loading files, window_short, window_long, atr_window, period and
+    freq for VisualizationModule.plot_dashboard, max_points, downsample and dpi for VisualizationModule
+    returns: PipelineResult - dict of plot name -> file path per ticker in results, tracebacks in failures
+    raises: ValueError if the image format is not supported, or two files share a name
+    """
+    if image_format not in ["png", "svg"]:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    os.makedirs(output_dir, exist_ok=True)
+
+    if isinstance(sources, dict):
+        items = list(sources.items())
+    else:
+        paths = resolve_sources(sources, pattern)
+        items = list(zip(_file_stems(paths), paths))
+    n_workers = n_workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * n_workers
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+    result = PipelineResult()
+
+    def collect(outcomes):
+        for name, ok, payload in outcomes:
+            if ok:
+                result.results[name] = payload
+            else:
+                result.failures[name] = payload
+
+    if n_workers == 1:
+        for chunk in chunks:
+            collect(_render_chunk(chunk, output_dir, image_format, options))
+        return result
+
+    outcomes = iter_chunk_outcomes(_render_chunk, chunks, (output_dir, image_format, options), n_workers, max_pending,
+                                   name=lambda item: item[0])
+    collect(outcomes)
+    return result
@@ -1,45 +1,324 @@
+import asyncio
+import io
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
+from cache import DatasetCache
+from rolling import rolling_moments, rolling_quantiles
+from instrumentation import instrumented
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
 
 
 class DataProcessor:
     """
     for handling and preprocessing
     """
-    def __init__(self, file_path: str, file_format: str = "csv"):
+    def __init__(self, file_path: str, file_format: str = "csv", cache=None):
         """
         initialize the data processor with the file path and format
         parameters: file_path - path to the data file
         file_format - format of the data file (default is 'csv')
+        cache - DatasetCache or cache directory; parsed data is served from it while the file is unchanged (default is None)
         """
         self.file_path = file_path
         self.file_format = file_format
         self.data = None
+        if isinstance(cache, (str, os.PathLike)):
+            cache = DatasetCache(cache)
+        self.cache = cache
 
+    @instrumented
     def load_data(self):
         """
         load the data based on the file format
         """
+        self.data = self._fetch()
+        return self.data
+
+    def _fetch(self):
+        """
+        the parsed file, from the cache when one is set, without assigning it to self.data
+        """
+        if self.cache is None:
+            return self._read()
+
+        key = self.cache.make_key(self.file_path, file_format=self.file_format)
+        data = self.cache.get(key)
+        if data is None:
+            data = self._read()
+            self.cache.put(key, data, source=self.file_path)
+        return data
+
+    def _read(self):
+        """
+        parse the file based on the file format
+        """
+        return _parse(self.file_path, self.file_format)
+
+    def read_bytes(self):
+        """
+        read the raw file content; the async loaders call it in an I/O thread, so a subclass can fetch
+        from another store (or inject latency) by overriding it
+        returns: bytes
+        """
+        with open(self.file_path, "rb") as f:
+            return f.read()
+
+    async def aload_data(self, parse_executor=None, io_executor=None):
+        """
+        load the data without blocking the event loop: the file is read in an I/O thread and parsed in an executor
+        parameters: parse_executor - executor for parsing, a ProcessPoolExecutor moves it off the GIL (default is the loop's executor)
+        io_executor - executor for read_bytes (default is the loop's executor)
+        returns: pd.DataFrame - the same frame load_data returns
+        """
+        loop = asyncio.get_running_loop()
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(self.file_path, file_format=self.file_format)
+            self.data = await loop.run_in_executor(io_executor, self.cache.get, key)
+            if self.data is not None:
+                return self.data
+
+        if self.file_format == "hdf5":
+            # HDF5 is read through its own file handle, so it cannot be parsed from bytes
+            self.data = await loop.run_in_executor(parse_executor, _parse, self.file_path, self.file_format)
+        else:
+            raw = await loop.run_in_executor(io_executor, self.read_bytes)
+            self.data = await loop.run_in_executor(parse_executor, _parse, raw, self.file_format)
+
+        if key is not None:
+            await loop.run_in_executor(io_executor, self.cache.put, key, self.data, self.file_path)
+        return self.data
+
+    @classmethod
+    async def aload_many(cls, paths, file_format: str = "csv", concurrency: int = 16, parse_executor=None,
+                         cache=None, return_exceptions: bool = False):
+        """
+        load many files concurrently; at most `concurrency` files are being read or parsed at once,
+        so slow reads overlap while memory stays bounded
+        parameters: paths - list of file paths
+        file_format - format of the data files (default is 'csv')
+        concurrency - number of files in flight (default is 16)
+        parse_executor - executor for parsing (default is the loop's executor)
+        cache - DatasetCache or cache directory shared by all files (default is None)
+        return_exceptions - return the exception of a failed file instead of raising it (default is False)
+        returns: dict - file path -> pd.DataFrame, in the order of paths
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        if isinstance(cache, (str, os.PathLike)):
+            cache = DatasetCache(cache)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as io_executor:
+            async def load(path):
+                async with semaphore:
+                    return await cls(path, file_format=file_format, cache=cache).aload_data(parse_executor, io_executor)
+
+            # every load finishes before the I/O threads are shut down, failed or not
+            frames = await asyncio.gather(*(load(path) for path in paths), return_exceptions=True)
+        if not return_exceptions:
+            for frame in frames:
+                if isinstance(frame, BaseException):
+                    raise frame
+        return dict(zip(paths, frames))
+
+    def between(self, start=None, end=None):
+        """
+        lazy view of the rows between two times; nothing is read until a result is requested, and then only
+        that range (binary search on loaded data, early stop for csv, row-group filters for parquet)
+        parameters: start, end - range of the index, inclusive; a partial string end such as '2010' includes the whole
+        period, like .loc (default is unbounded)
+        returns: TimeRangeView - resample_data adds to its plan, collect/detect_outliers/smooth_data run it
+        """
+        return TimeRangeView(self, start, end)
+
+    def load_range(self, start=None, end=None, chunksize: int = 100000):
+        """
+        load only the rows between two times without changing self.data
+        parameters: start, end - range of the index, inclusive (see between)
+        chunksize - rows per chunk when a csv file is scanned (default is 100000)
+        returns: pd.DataFrame - a view of self.data when it is loaded, otherwise the rows read from the file
+        raises: ValueError if the data has no DatetimeIndex
+        """
+        start, end = _time_bounds(start, end)
+        if self.data is not None:
+            return _slice_range(self.data, start, end)
+        if self.cache is not None or self.file_format not in ["csv", "parquet"]:
+            # a cached frame is served whole anyway; other formats cannot skip rows
+            return _slice_range(self._fetch(), start, end)
+        if self.file_format == "parquet":
+            return _slice_range(self._read_parquet_range(start, end), start, end)
+
+        parts = []
+        previous_last = None
+        for chunk in pd.read_csv(self.file_path, parse_dates=True, index_col=0, chunksize=chunksize):
+            parts.append(_slice_range(chunk, start, end))
+            in_order = chunk.index.is_monotonic_increasing and (previous_last is None or chunk.index[0] >= previous_last)
+            previous_last = chunk.index[-1] if len(chunk) else previous_last
+            if not in_order:
+                # rows out of time order: every later chunk has to be checked
+                previous_last = pd.Timestamp.max
+            elif end is not None and len(chunk) and chunk.index[-1] > end:
+                break
+        return pd.concat(parts) if parts else pd.DataFrame()
+
+    def _read_parquet_range(self, start, end):
+        """
+        read a parquet file with filters on its index column, so row groups outside the range are skipped
+        using their min/max statistics
+        """
+        filters = []
+        try:
+            import pyarrow.parquet as pq
+            index_columns = (pq.read_schema(self.file_path).pandas_metadata or {}).get("index_columns", [])
+        except ImportError:
+            index_columns = []
+        if index_columns and isinstance(index_columns[0], str):
+            if start is not None:
+                filters.append((index_columns[0], ">=", start))
+            if end is not None:
+                filters.append((index_columns[0], "<=", end))
+        return pd.read_parquet(self.file_path, filters=filters or None)
+
+    def iter_chunks(self, chunksize: int = 100000, dtype=None):
+        """
+        load the data as a stream of DataFrame chunks so peak memory is bounded by the chunk size
+        parameters: chunksize - number of rows per chunk (default is 100000)
+        dtype - column dtypes (default is float32 for the OHLCV columns found in the file)
+        returns: iterator of pd.DataFrame chunks
+        raises: ValueError if the file format does not support chunked reading
+        """
         if self.file_format == "csv":
-            self.data = pd.read_csv(self.file_path, parse_dates=True, index_col=0)
-        elif self.file_format in ["xlsx", "xls"]:
-            self.data = pd.read_excel(self.file_path, parse_dates=True, index_col=0)
+            if dtype is None:
+                header = pd.read_csv(self.file_path, index_col=0, nrows=0).columns
+                dtype = {column: np.float32 for column in header if column.lower() in OHLCV_COLUMNS}
+            return iter(pd.read_csv(self.file_path, parse_dates=True, index_col=0, chunksize=chunksize, dtype=dtype))
         elif self.file_format == "jsonl":
-            self.data = pd.read_json(self.file_path, lines=True)
-        elif self.file_format == "parquet":
-            self.data = pd.read_parquet(self.file_path)
-        elif self.file_format == "hdf5":
-            self.data = pd.read_hdf(self.file_path)
+            return iter(pd.read_json(self.file_path, lines=True, chunksize=chunksize, dtype=dtype))
         else:
-            raise ValueError(f"Unsupported file format: {self.file_format}")
-        return self.data
+            raise ValueError(f"Chunked loading is not supported for file format: {self.file_format}")
+
+    def resample_chunks(self, frequency: str = "D", agg_method: str = "mean", chunks=None):
+        """
+        resample a stream of chunks; a bucket cut by a chunk boundary is carried over as one partial
+        aggregate row, so the output equals resample_data on the whole file
+        parameters: frequency - the desired frequency ('D' for daily, 'W' for weekly, 'M' for monthly) (using pd)
+        - agg_method - aggregation method ('mean', 'sum', 'last')
+        - chunks - iterable of DataFrame chunks in time order (default is self.iter_chunks())
+        returns: iterator of pd.DataFrame - resampled buckets, each emitted once it is complete
+        """
+        if agg_method not in ["mean", "sum", "last"]:
+            raise ValueError(f"Unsupported aggregation method: {agg_method}")
+        if chunks is None:
+            chunks = self.iter_chunks()
+        return self._resample_chunks(chunks, frequency, agg_method)
+
+    def _resample_chunks(self, chunks, frequency, agg_method):
+        rule = None
+        carry_values = carry_counts = None
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            if rule is None:
+                rule = self._resample_rule(chunk.index[0], frequency)
+
+            if agg_method == "last":
+                values = self._prepend(carry_values, chunk).resample(**rule).last()
+                result = values
+            else:
+                values = self._prepend(carry_values, chunk).resample(**rule).sum()
+                result = values
+                if agg_method == "mean":
+                    counts = self._prepend(carry_counts, chunk.notna().astype(np.int64))
+                    counts = counts.resample(**rule).sum()
+                    result = self._divide(values, counts)
+                    carry_counts = counts.iloc[[-1]].set_axis(chunk.index[-1:])
+
+            # the last bucket may continue in the next chunk
+            carry_values = values.iloc[[-1]].set_axis(chunk.index[-1:])
+            if len(result) > 1:
+                yield result.iloc[:-1]
+            last = result.iloc[[-1]]
+
+        if rule is not None:
+            yield last
+
+    @staticmethod
+    def _resample_rule(first_timestamp, frequency):
+        """
+        fixed-duration bins are anchored at midnight of the first day of the data; pin that anchor so
+        every chunk uses the bins of the whole file (calendar frequencies are anchored by the calendar)
+        """
+        offset = pd.tseries.frequencies.to_offset(frequency)
+        if isinstance(offset, pd.offsets.Day):
+            # Day is calendar-based in newer pandas and ignores origin, so use the same fixed duration
+            offset = pd.Timedelta(days=offset.n)
+        elif not isinstance(offset, pd.offsets.Tick):
+            return {"rule": frequency}
+        return {"rule": offset, "origin": first_timestamp.normalize()}
+
+    @staticmethod
+    def _prepend(carry, chunk):
+        return chunk if carry is None else pd.concat([carry, chunk])
+
+    @staticmethod
+    def _divide(sums, counts):
+        means = sums / counts.where(counts > 0)
+        return means.astype({column: np.float32 for column, kind in sums.dtypes.items() if kind == np.float32})
+
+    def smooth_chunks(self, column: str, window_size: int = 5, chunks=None):
+        """
+        smooth a stream of chunks using a rolling average, carrying the last window_size - 1 values
+        across chunk boundaries so the output equals smooth_data on the whole file
+        parameters: column - the column to smooth
+        window_size - the size of the moving window (default is 5)
+        chunks - iterable of DataFrame chunks in time order (default is self.iter_chunks())
+        returns: iterator of pd.Series - smoothed data for each chunk
+        """
+        if chunks is None:
+            chunks = self.iter_chunks()
+        return self._smooth_chunks(chunks, column, window_size)
+
+    def _smooth_chunks(self, chunks, column, window_size):
+        tail = None
+        for chunk in chunks:
+            if column not in chunk.columns:
+                raise ValueError(f"Column {column} not found in data.")
+            series = self._prepend(tail, chunk[column])
+            smoothed = series.rolling(window=window_size).mean()
+            yield smoothed.iloc[len(series) - len(chunk):]
+            tail = series.iloc[-(window_size - 1):] if window_size > 1 else series.iloc[:0]
+
+    @instrumented
+    def build_pyramid(self, levels=None, path: str = None):
+        """
+        pre-aggregate the loaded data into OHLCV bars at several resolutions, so daily, weekly and monthly
+        views are range queries instead of resample_data calls
+        parameters: levels - resample rules from fine to coarse (default is 5min, 1h, 1D, W-MON, MS)
+        path - directory the pyramid is saved to, reload it with OHLCVPyramid.load(path) (default is None)
+        returns: OHLCVPyramid
+        raises: ValueError if data not loaded
+        """
+        from pyramid import DEFAULT_LEVELS, OHLCVPyramid  # pyramid builds on this module
+
+        if self.data is None:
+            raise ValueError("Data not loaded. Please load the data first.")
+        pyramid = OHLCVPyramid.from_frame(self.data, levels=levels or DEFAULT_LEVELS)
+        if path is not None:
+            pyramid.save(path)
+        return pyramid
 
+    @instrumented
     def resample_data(self, frequency: str = "D", agg_method: str = "mean"):
         """
         resample the time series data to a specified frequency
         parameters: frequency - the desired frequency ('D' for daily, 'W' for weekly, 'M' for monthly) (using pd)
-        - agg_method - aggregation method ('mean', 'sum', 'last')
-        returns: pd.DataFrame - resampled data
+        - agg_method - aggregation method ('mean', 'sum', 'last', 'ohlc')
+        returns: pd.DataFrame - resampled data ('ohlc' gives (column, open/high/low/close) columns)
         """
         if self.data is None:
             raise ValueError("Data not loaded. Please load the data first.")
@@ -50,18 +329,27 @@ class DataProcessor:
             resampled_data = self.data.resample(frequency).sum()
         elif agg_method == "last":
             resampled_data = self.data.resample(frequency).last()
+        elif agg_method == "ohlc":
+            resampled_data = self.data.resample(frequency).ohlc()
         else:
             raise ValueError(f"Unsupported aggregation method: {agg_method}")
         return resampled_data
 
-    def detect_outliers(self, column: str, method: str = "zscore", threshold: float = 3.0):
+    @instrumented
+    def detect_outliers(self, column: str, method: str = "zscore", threshold: float = 3.0, window: int = 20):
         """
         detect outliers in the data based on the specified method
-        parameters: column - the column to check for outliers
-        method - outlier detection method (default is 'zscore')
+        parameters: column - the column to check for outliers, or a list of columns checked in one vectorized pass
+        method - outlier detection method: 'zscore', 'iqr', or their local variants 'rolling_zscore' and
+        'rolling_iqr' that use statistics of the trailing window instead of the whole history (default is 'zscore')
         threshold - threshold for identifying outliers (default of 3.0 for z-score)
-        returns: pd.Series - boolean series indicating outliers
+        window - window size for the rolling methods (default is 20)
+        returns: pd.Series - boolean series indicating outliers (pd.DataFrame of one boolean column per column
+        when a list is given)
         """
+        if isinstance(column, (list, tuple)):
+            mask, _, _ = _outlier_bounds(self._column_block(column), method, threshold, window)
+            return pd.DataFrame(mask.T, index=self.data.index, columns=list(column))
         if column not in self.data.columns:
             raise ValueError(f"Column {column} not found in data.")
         
@@ -69,14 +357,88 @@ class DataProcessor:
             z_scores = (self.data[column] - self.data[column].mean()) / self.data[column].std()
             outliers = abs(z_scores) > threshold
         elif method == "iqr":
-            Q1 = self.data[column].quantile(0.25)
-            Q3 = self.data[column].quantile(0.75)
+            Q1, Q3 = self.data[column].quantile([0.25, 0.75])
             IQR = Q3 - Q1
             outliers = ~self.data[column].between(Q1 - 1.5 * IQR, Q3 + 1.5 * IQR)
+        elif method in ["rolling_zscore", "rolling_iqr"]:
+            # the window statistics are shared with the multi-column path
+            mask, _, _ = _outlier_bounds(self._column_block([column]), method, threshold, window)
+            outliers = pd.Series(mask[0], index=self.data.index, name=column)
         else:
             raise ValueError(f"Unsupported outlier detection method: {method}")
         return outliers
 
+    @instrumented
+    def clean_outliers(self, columns=None, method: str = "zscore", threshold: float = 3.0, window: int = 20,
+                       action: str = "clip"):
+        """
+        detect outliers in several columns and act on them in the same pass
+        parameters: columns - columns to clean (default is the OHLCV columns found in the data)
+        method, threshold, window - as in detect_outliers
+        action - 'drop' the rows with an outlier in any column, 'clip' (winsorize) outliers to the method's bounds,
+        'ffill' them with the last valid value of their column or 'interpolate' them linearly between valid
+        neighbours (default is 'clip'); missing values are never flagged (not even by 'iqr', unlike detect_outliers)
+        and are left as they are
+        returns: (pd.DataFrame, pd.DataFrame) - cleaned copy of the data (cleaned columns are float64) and the
+        boolean outlier mask of the cleaned columns
+        raises: ValueError if data not loaded, a column is missing, or the method or action is not supported
+        """
+        if action not in ["drop", "clip", "ffill", "interpolate"]:
+            raise ValueError(f"Unsupported cleaning action: {action}")
+        if self.data is None:
+            raise ValueError("Data not loaded. Please load the data first.")
+        if columns is None:
+            columns = [column for column in self.data.columns if str(column).lower() in OHLCV_COLUMNS]
+
+        # one (columns, rows) block: every row of it is one column, cleaned in place and handed to the result
+        block = self._column_block(columns)
+        mask, lower, upper = _outlier_bounds(block, method, threshold, window)
+        if method == "iqr":
+            # detect_outliers reports missing values as outside the iqr bounds; they are not outliers to clean
+            mask &= ~np.isnan(block)
+        mask_frame = pd.DataFrame(mask.T, index=self.data.index, columns=list(columns))
+        if action == "drop":
+            return self.data[~mask.any(axis=0)], mask_frame
+
+        if action == "clip":
+            np.fmax(block, lower, out=block, where=mask)
+            np.fmin(block, upper, out=block, where=mask)
+        else:
+            positions = np.arange(block.shape[1])
+            for i, column_values in enumerate(block):
+                if not mask[i].any():
+                    continue
+                known = positions[~mask[i] & ~np.isnan(column_values)]
+                missing = positions[mask[i]]
+                previous = np.searchsorted(known, missing) - 1
+                if not len(known):
+                    filled = np.nan
+                elif action == "ffill":
+                    filled = column_values[known[np.maximum(previous, 0)]]
+                else:
+                    filled = np.interp(missing, known, column_values[known])
+                # nothing to carry or interpolate from before the first valid value
+                column_values[missing] = np.where(previous >= 0, filled, np.nan)
+
+        # built from Series views, so the cleaned rows of the block and the untouched columns are not copied again
+        cleaned = {column: pd.Series(block[i], index=self.data.index, name=column, copy=False)
+                   for i, column in enumerate(columns)}
+        cleaned = pd.DataFrame({column: cleaned[column] if column in cleaned else self.data[column]
+                                for column in self.data.columns}, copy=False)
+        return cleaned, mask_frame
+
+    def _column_block(self, columns):
+        """
+        the columns as one float64 (columns, rows) array, one allocation for all of them
+        """
+        block = np.empty((len(columns), len(self.data)))
+        for i, column in enumerate(columns):
+            if column not in self.data.columns:
+                raise ValueError(f"Column {column} not found in data.")
+            block[i] = self.data[column].to_numpy(dtype=float)
+        return block
+
+    @instrumented
     def smooth_data(self, column: str, window_size: int = 5):
         """
         smooth the data using a rolling average
@@ -88,3 +450,150 @@ class DataProcessor:
             raise ValueError(f"Column {column} not found in data.")
         
         return self.data[column].rolling(window=window_size).mean()
+
+
+class TimeRangeView:
+    """
+    a time range of a DataProcessor plus a plan of operations, evaluated when a result is requested
+    """
+    def __init__(self, processor, start=None, end=None, steps=()):
+        """
+        parameters: processor - the DataProcessor the rows come from
+        start, end - range of the index, inclusive (see DataProcessor.between)
+        steps - planned (method name, arguments) pairs
+        """
+        self.processor = processor
+        self.start = start
+        self.end = end
+        self.steps = tuple(steps)
+
+    def resample_data(self, frequency: str = "D", agg_method: str = "mean"):
+        """
+        plan a resample_data step
+        returns: TimeRangeView - a new view with the step added
+        """
+        if agg_method not in ["mean", "sum", "last", "ohlc"]:
+            raise ValueError(f"Unsupported aggregation method: {agg_method}")
+        return TimeRangeView(self.processor, self.start, self.end,
+                             self.steps + (("resample_data", (frequency, agg_method)),))
+
+    def collect(self):
+        """
+        read the range and run the planned steps
+        returns: pd.DataFrame
+        """
+        data = self.processor.load_range(self.start, self.end)
+        for name, args in self.steps:
+            data = getattr(self._processor_for(data), name)(*args)
+        return data
+
+    def detect_outliers(self, column: str, method: str = "zscore", threshold: float = 3.0, window: int = 20):
+        """
+        run the plan and detect outliers in the result (see DataProcessor.detect_outliers)
+        returns: pd.Series - boolean series indicating outliers
+        """
+        return self._processor_for(self.collect()).detect_outliers(column, method, threshold, window)
+
+    def smooth_data(self, column: str, window_size: int = 5):
+        """
+        run the plan and smooth a column of the result (see DataProcessor.smooth_data); the first
+        window_size - 1 rows of the range have no history and are NaN
+        returns: pd.Series - smoothed data as a rolling average
+        """
+        return self._processor_for(self.collect()).smooth_data(column, window_size)
+
+    def _processor_for(self, data):
+        processor = DataProcessor(self.processor.file_path, self.processor.file_format)
+        processor.data = data
+        return processor
+
+    def __repr__(self):
+        plan = "".join(f".{name}{args}" for name, args in self.steps)
+        return f"TimeRangeView({self.processor.file_path!r}, {self.start!r}, {self.end!r}){plan}"
+
+
+def _outlier_bounds(block, method, threshold, window):
+    """
+    outlier mask and lower and upper bounds of every row of a (columns, rows) block; each column's statistics are
+    computed on its contiguous row, the mask for all columns at once. The bounds broadcast against the block (one
+    per column, or one per value for the rolling methods) and are NaN where nothing can be an outlier
+    """
+    global_method = method in ["zscore", "iqr"]
+    if not global_method and method not in ["rolling_zscore", "rolling_iqr"]:
+        raise ValueError(f"Unsupported outlier detection method: {method}")
+    shape = (len(block), 1) if global_method else block.shape
+    lower, upper = np.empty(shape), np.empty(shape)
+    with warnings.catch_warnings():
+        # an all-NaN column has no statistics and no outliers
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for i, values in enumerate(block):
+            has_nan = np.isnan(values).any()
+            if method == "zscore":
+                mean = np.nanmean(values) if has_nan else values.mean()
+                std = np.nanstd(values, ddof=1) if has_nan else values.std(ddof=1)
+                lower[i], upper[i] = mean - threshold * std, mean + threshold * std
+            elif method == "iqr":
+                Q1, Q3 = np.nanquantile(values, [0.25, 0.75]) if has_nan else np.quantile(values, [0.25, 0.75])
+                lower[i], upper[i] = Q1 - 1.5 * (Q3 - Q1), Q3 + 1.5 * (Q3 - Q1)
+            elif method == "rolling_zscore":
+                mean, var = np.empty((1, len(values))), np.empty((1, len(values)))
+                rolling_moments(values, [window], mean, var)
+                # a flat window has no spread, so nothing in it is an outlier
+                spread = np.where(var[0] > 0, threshold * np.sqrt(var[0]), np.nan)
+                np.subtract(mean[0], spread, out=lower[i])
+                np.add(mean[0], spread, out=upper[i])
+            else:
+                Q1, Q3 = rolling_quantiles(values, window, [0.25, 0.75])
+                lower[i], upper[i] = Q1 - 1.5 * (Q3 - Q1), Q3 + 1.5 * (Q3 - Q1)
+    if method == "iqr":
+        # like Series.between, a missing value is outside the bounds
+        return ~((block >= lower) & (block <= upper)), lower, upper
+    return (block < lower) | (block > upper), lower, upper
+
+
+def _time_bounds(start, end):
+    """
+    turn range bounds into Timestamps; a partial string end such as '2010' becomes the end of that period
+    """
+    start = None if start is None else pd.Timestamp(start)
+    if end is not None:
+        end = pd.Period(end).end_time if isinstance(end, str) else pd.Timestamp(end)
+    return start, end
+
+
+def _slice_range(data, start, end):
+    """
+    rows of data between two Timestamps, by binary search when the index is sorted
+    """
+    if not isinstance(data.index, pd.DatetimeIndex):
+        raise ValueError("Index must be a DatetimeIndex to select a time range.")
+    if not data.index.is_monotonic_increasing:
+        mask = np.ones(len(data), dtype=bool)
+        if start is not None:
+            mask &= data.index >= start
+        if end is not None:
+            mask &= data.index <= end
+        return data[mask]
+    lo = 0 if start is None else data.index.searchsorted(start, side="left")
+    hi = len(data) if end is None else data.index.searchsorted(end, side="right")
+    return data.iloc[lo:hi]
+
+
+def _parse(source, file_format):
+    """
+    parse a file path or its raw bytes based on the file format (module level so process pools can pickle it)
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    if file_format == "csv":
+        return pd.read_csv(source, parse_dates=True, index_col=0)
+    elif file_format in ["xlsx", "xls"]:
+        return pd.read_excel(source, parse_dates=True, index_col=0)
+    elif file_format == "jsonl":
+        return pd.read_json(source, lines=True)
+    elif file_format == "parquet":
+        return pd.read_parquet(source)
+    elif file_format == "hdf5":
+        return pd.read_hdf(source)
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
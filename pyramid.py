@@ -0,0 +1,173 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from compact import CompactOHLCV
+from processor import DataProcessor, _time_bounds
+
+DEFAULT_LEVELS = ["5min", "1h", "1D", "W-MON", "MS"]
+
+# how the bars of a level combine into the bars of the next one; other columns keep their last value
+AGGREGATIONS = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+class OHLCVPyramid:
+    """
+    pre-aggregated OHLCV bars at several resolutions, each level derived from the finest level that nests into it
+
+    every level holds left-closed bars labelled by their start ([label, next label)), so a finer bar never
+    straddles a coarser one: weekly bars are 'W-MON' (the week starting on Monday) and monthly bars 'MS'.
+    Fixed-duration bins are anchored at midnight of the first day of the data, like resample_data. Only bars
+    that contain rows are stored; range queries bisect the sorted labels.
+    """
+    def __init__(self, levels, columns, counts):
+        """
+        parameters: levels - dict rule -> CompactOHLCV of that level's bars (float64)
+        columns - column names
+        counts - dict rule -> array with the number of raw rows in each bar
+        """
+        self.levels = levels
+        self.columns = list(columns)
+        self.counts = counts
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, levels=DEFAULT_LEVELS):
+        """
+        build the pyramid in one pass over the raw data
+        parameters: frame - DataFrame with a DatetimeIndex (e.g. DataProcessor.data)
+        levels - resample rules from fine to coarse (default is 5min, 1h, 1D, W-MON, MS)
+        returns: OHLCVPyramid
+        raises: ValueError if the index is not a DatetimeIndex or the frame is empty
+        """
+        if not isinstance(frame.index, pd.DatetimeIndex):
+            raise ValueError("Index must be a DatetimeIndex.")
+        if frame.empty:
+            raise ValueError("Cannot build a pyramid from empty data.")
+        columns = list(frame.columns)
+        agg = {column: AGGREGATIONS.get(str(column).lower(), "last") for column in columns}
+        first, last = frame.index.min(), frame.index.max()
+        rules = {level: cls._rule(first, level) for level in levels}
+
+        built, counts = {}, {}
+        for level in levels:
+            parent = cls._parent(level, list(built), rules, first, last)
+            if parent is None:
+                source, source_counts = frame, pd.Series(1, index=frame.index)
+            else:
+                source = built[parent].to_frame()
+                source_counts = pd.Series(counts[parent], index=source.index)
+            bars = source.resample(**rules[level]).agg(agg)
+            bar_counts = source_counts.resample(**rules[level]).sum()
+            keep = bar_counts.to_numpy() > 0
+            bars, bar_counts = bars[keep], bar_counts[keep]
+            built[level] = CompactOHLCV.from_frame(bars, columns=columns, dtype=np.float64)
+            counts[level] = bar_counts.to_numpy(dtype=np.int64)
+        return cls(built, columns, counts)
+
+    @staticmethod
+    def _rule(first_timestamp, level):
+        rule = DataProcessor._resample_rule(first_timestamp, level)
+        if "origin" in rule:
+            rule["rule"] = pd.Timedelta(rule["rule"])
+        rule.update(closed="left", label="left")
+        return rule
+
+    @classmethod
+    def _parent(cls, level, candidates, rules, first, last):
+        """
+        the finest already built level whose bar boundaries include every boundary of this level
+        """
+        for candidate in reversed(candidates):
+            if cls._nests(rules[level], rules[candidate], first, last):
+                return candidate
+        return None
+
+    @staticmethod
+    def _nests(coarse, fine, first, last):
+        coarse_rule, fine_rule = coarse["rule"], fine["rule"]
+        if isinstance(coarse_rule, pd.Timedelta):
+            # both anchored at the same midnight
+            return isinstance(fine_rule, pd.Timedelta) and coarse_rule % fine_rule == pd.Timedelta(0)
+        offset = pd.tseries.frequencies.to_offset(coarse_rule)
+        boundaries = pd.date_range(first.normalize() - offset, last + offset, freq=offset)
+        if isinstance(fine_rule, pd.Timedelta):
+            return bool(((boundaries - fine["origin"]) % fine_rule == pd.Timedelta(0)).all())
+        fine_offset = pd.tseries.frequencies.to_offset(fine_rule)
+        return all(fine_offset.is_on_offset(boundary) for boundary in boundaries)
+
+    def query(self, level=None, start=None, end=None, max_bars: int = 2000):
+        """
+        bars of one level between two times, found by bisection of the level's labels
+        parameters: level - resample rule of a stored level (default is the finest level with at most max_bars bars
+        in the range, for plotting)
+        start, end - range of bar labels, inclusive; a partial string end such as '2010' includes the whole period
+        (default is the whole level)
+        max_bars - bar budget used when level is None (default is 2000)
+        returns: pd.DataFrame - the bars
+        raises: KeyError if the level is not stored
+        """
+        if level is None:
+            level = self.select_level(start, end, max_bars)
+        bars = self.levels[level]
+        lo, hi = self._bounds(bars.index_values, start, end)
+        return pd.DataFrame(bars.values[:, lo:hi].T, index=bars.index[lo:hi], columns=self.columns)
+
+    def select_level(self, start=None, end=None, max_bars: int = 2000):
+        """
+        returns: str - the finest level with at most max_bars bars between start and end (the coarsest otherwise)
+        """
+        for level, bars in self.levels.items():
+            lo, hi = self._bounds(bars.index_values, start, end)
+            if hi - lo <= max_bars:
+                return level
+        return list(self.levels)[-1]
+
+    @staticmethod
+    def _bounds(labels, start, end):
+        start, end = _time_bounds(start, end)
+        lo = 0 if start is None else np.searchsorted(labels, start.to_datetime64(), side="left")
+        hi = len(labels) if end is None else np.searchsorted(labels, end.to_datetime64(), side="right")
+        return lo, hi
+
+    @property
+    def nbytes(self):
+        return sum(bars.nbytes + self.counts[level].nbytes for level, bars in self.levels.items())
+
+    def save(self, directory: str):
+        """
+        write every level as .npy files (labels, values, counts) plus meta.json
+        parameters: directory - target directory (created if missing)
+        """
+        os.makedirs(directory, exist_ok=True)
+        for i, (level, bars) in enumerate(self.levels.items()):
+            np.save(os.path.join(directory, f"level_{i}_index.npy"), bars.index_values)
+            np.save(os.path.join(directory, f"level_{i}_values.npy"), bars.values)
+            np.save(os.path.join(directory, f"level_{i}_counts.npy"), self.counts[level])
+        index_name = next(iter(self.levels.values())).index_name
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({"levels": list(self.levels), "columns": self.columns, "index_name": index_name}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True):
+        """
+        load a saved pyramid
+        parameters: directory - directory written by save()
+        mmap - memory-map the levels instead of reading them (default is True)
+        returns: OHLCVPyramid
+        """
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        levels, counts = {}, {}
+        for i, level in enumerate(meta["levels"]):
+            index_values = np.asarray(np.load(os.path.join(directory, f"level_{i}_index.npy"), mmap_mode=mode))
+            values = np.asarray(np.load(os.path.join(directory, f"level_{i}_values.npy"), mmap_mode=mode))
+            levels[level] = CompactOHLCV(index_values, values, meta["columns"], meta["index_name"])
+            counts[level] = np.asarray(np.load(os.path.join(directory, f"level_{i}_counts.npy"), mmap_mode=mode))
+        return cls(levels, meta["columns"], counts)
+
+    def __repr__(self):
+        sizes = ", ".join(f"{level}: {len(bars)}" for level, bars in self.levels.items())
+        return f"OHLCVPyramid({sizes})"
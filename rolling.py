@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# elements per chunk when selecting order statistics from a sliding-window view
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def rolling_quantiles(values, window, quantiles):
+    """
+    Rolling quantiles (linear interpolation, as Series.rolling(window).quantile) for several quantiles.
+    Windows up to 8 rows per requested quantile take every quantile from one np.quantile over a
+    sliding-window view, chunked so memory stays bounded: one pass for all of them. Longer windows
+    call pandas' compiled skiplist once per quantile; it keeps the window sorted in O(log window)
+    per row, which is faster there than partitioning every window or a sorted window kept in Python.
+    :param values: 1-D float array.
+    :param window: Window size.
+    :param quantiles: List of quantiles in [0, 1].
+    :return: Array (len(quantiles), len(values)), NaN where the window is incomplete or contains NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    result = np.full((len(quantiles), n), np.nan)
+    if window > n:
+        return result
+
+    if window > 8 * len(quantiles):
+        rolling = pd.Series(values).rolling(window)
+        for i, q in enumerate(quantiles):
+            result[i] = rolling.quantile(q).to_numpy()
+        return result
+
+    windows = sliding_window_view(values, window)
+    step = max(1, _CHUNK_ELEMENTS // window)
+    for start in range(0, len(windows), step):
+        chunk = windows[start:start + step]
+        result[:, window - 1 + start:window - 1 + start + len(chunk)] = np.quantile(chunk, quantiles, axis=1)
+    return result
+
+
+def rolling_moments(values, windows, mean_out, var_out=None):
+    """
+    Rolling mean and variance for many window sizes from shared prefix sums.
+    Windows are grouped into power-of-two tiers; each tier takes one pass of prefix sums that
+    restart at every block of the tier size around that block's mean, so the differences stay
+    small and the variance keeps its precision on long price series.
+    :param values: 1-D float array.
+    :param windows: Window sizes.
+    :param mean_out: Array (len(windows), len(values)) receiving the rolling means.
+    :param var_out: Optional array of the same shape receiving the rolling variances.
+    Rows are NaN where the window is incomplete or contains NaN (like rolling(window) with the default min_periods).
+    """
+    tiers = {}
+    for row, window in enumerate(windows):
+        tiers.setdefault(1 << (window - 1).bit_length(), []).append((row, window))
+    for block, tier in tiers.items():
+        _block_moments(values, tier, block, mean_out, var_out)
+
+
+def _block_moments(values, tier, block, mean_out, var_out):
+    """
+    Rolling mean and variance for (row, window) pairs no longer than block, from prefix sums restarting at every block.
+    Every per-row table is built once, so each window costs only slice arithmetic.
+    """
+    n = len(values)
+    n_blocks = -(-n // block)
+    padding = n_blocks * block - n
+    valid = ~np.isnan(values)
+    has_nan = not valid.all()
+    starts = np.arange(0, n, block)
+    blocks = np.repeat(np.arange(n_blocks), block)[:n]
+    ref = np.add.reduceat(np.where(valid, values, 0.0), starts) / np.maximum(np.add.reduceat(valid.astype(np.int64), starts), 1)
+    y = np.where(valid, values - ref[blocks], 0.0)
+
+    # inclusive prefix sums restarting at every block, and per-row copies of the block tables
+    local1 = np.cumsum(np.pad(y, (0, padding)).reshape(n_blocks, block), axis=1)
+    total1 = local1[:, -1][blocks]
+    local1 = local1.ravel()[:n]
+    before1 = local1 - y
+    row_ref = ref[blocks]
+    valid_prefix = np.concatenate(([0], np.cumsum(valid)))
+    # valid values from each row to the end of its block
+    to_block_end = valid_prefix[np.minimum((blocks + 1) * block, n)] - valid_prefix[:-1]
+    if var_out is not None:
+        y2 = y * y
+        local2 = np.cumsum(np.pad(y2, (0, padding)).reshape(n_blocks, block), axis=1)
+        total2 = local2[:, -1][blocks]
+        local2 = local2.ravel()[:n]
+        before2 = local2 - y2
+
+    for row, window in tier:
+        mean = mean_out[row]
+        var = var_out[row] if var_out is not None else None
+        mean[:window - 1] = np.nan
+        if var is not None:
+            var[:window - 1] = np.nan
+        if window > n:
+            continue
+        m = n - window + 1
+        end = slice(window - 1, n)
+
+        # a window reaches at most into the previous block; that part is moved onto the reference of the end block
+        spanning = blocks[:m] != blocks[end]
+        shift = row_ref[:m] - row_ref[end]
+        s1 = local1[end] - before1[:m] + spanning * total1[:m] + to_block_end[:m] * shift
+        np.add(s1 / window, row_ref[end], out=mean[end])
+        if var is not None:
+            if window == 1:
+                var[:] = np.nan
+            else:
+                s2 = (local2[end] - before2[:m] + spanning * total2[:m]
+                      + shift * (2 * (total1[:m] - before1[:m]) + to_block_end[:m] * shift))
+                np.maximum(s2 - s1 * s1 / window, 0.0, out=var[end])
+                var[end] /= window - 1
+
+        if has_nan:
+            incomplete = valid_prefix[window:] - valid_prefix[:m] < window
+            mean[end][incomplete] = np.nan
+            if var is not None:
+                var[end][incomplete] = np.nan
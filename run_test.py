@@ -4,6 +4,15 @@ import unittest
 import test_processor
 import test_statssummaries
 import test_visualization
+import test_pipeline
+import test_streaming
+import test_cache
+import test_rolling
+import test_compact
+import test_instrumentation
+import test_pyramid
+import test_kernels
+import test_sharedmem
 
 # initialize test suite
 loader = unittest.TestLoader()
@@ -14,6 +23,15 @@ suite = unittest.TestSuite()
 suite.addTest(loader.loadTestsFromModule(test_processor))
 suite.addTest(loader.loadTestsFromModule(test_statssummaries))
 suite.addTest(loader.loadTestsFromModule(test_visualization))
+suite.addTest(loader.loadTestsFromModule(test_pipeline))
+suite.addTest(loader.loadTestsFromModule(test_streaming))
+suite.addTest(loader.loadTestsFromModule(test_cache))
+suite.addTest(loader.loadTestsFromModule(test_rolling))
+suite.addTest(loader.loadTestsFromModule(test_compact))
+suite.addTest(loader.loadTestsFromModule(test_instrumentation))
+suite.addTest(loader.loadTestsFromModule(test_pyramid))
+suite.addTest(loader.loadTestsFromModule(test_kernels))
+suite.addTest(loader.loadTestsFromModule(test_sharedmem))
 
 # initialize a test runner and run the test suite
 
@@ -0,0 +1,167 @@
+import json
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from compact import CompactOHLCV
+from processor import OHLCV_COLUMNS
+
+
+def default_root():
+    """
+    directory the datasets are published to: /dev/shm (RAM-backed, so mapping a dataset never touches a disk) when it
+    exists, otherwise the temporary directory
+    """
+    base = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+    return os.path.join(base, "ohlcv-shared")
+
+
+class SharedDatasetRegistry:
+    """
+    publishes OHLCV datasets once so every process on the machine can map them by name instead of loading its own copy
+
+    a dataset is the CompactOHLCV layout (a datetime64 index and one columns x rows block) written as .npy files under
+    <root>/<name>; attach() maps them read-only, so all processes share the same physical pages. The registry owns
+    what it published: unpublish() or close() removes the files, and close() also runs when the registry is garbage
+    collected or the publishing process exits. Processes that are still attached keep a valid mapping after removal.
+    """
+    def __init__(self, root: str = None):
+        """
+        parameters: root - directory of the published datasets (default is default_root())
+        """
+        self.root = root or default_root()
+        os.makedirs(self.root, exist_ok=True)
+        self._names = set()
+        self._finalizer = weakref.finalize(self, _remove_all, self.root, self._names, os.getpid())
+
+    def publish(self, name: str, data, columns=None, dtype=np.float32, replace: bool = False):
+        """
+        write a dataset to shared memory
+        parameters: name - dataset name, used by attach()
+        data - DataFrame with a DatetimeIndex or a CompactOHLCV
+        columns - columns to publish (default is the OHLCV columns found in a DataFrame)
+        dtype - storage dtype for a DataFrame (default is float32, see CompactOHLCV)
+        replace - replace a dataset of the same name (default is False)
+        returns: str - the dataset directory
+        raises: ValueError if the name is taken or not a plain file name, or the data has no DatetimeIndex
+        """
+        if not name or os.path.basename(name) != name or name.startswith("."):
+            raise ValueError(f"Invalid dataset name: {name}")
+        target = os.path.join(self.root, name)
+        if os.path.exists(target) and not replace:
+            raise ValueError(f"Dataset {name} is already published.")
+
+        # written under a temporary name and renamed, so attach() never sees a partial dataset
+        staging = tempfile.mkdtemp(prefix=f".{name}.", dir=self.root)
+        try:
+            if isinstance(data, CompactOHLCV):
+                columns, index_name = data.columns, data.index_name
+                np.save(os.path.join(staging, "index.npy"), data.index_values)
+                np.save(os.path.join(staging, "values.npy"), data.values)
+            else:
+                if not isinstance(data.index, pd.DatetimeIndex):
+                    raise ValueError("Index must be a DatetimeIndex.")
+                columns = columns or [column for column in data.columns if str(column).lower() in OHLCV_COLUMNS]
+                index_name = data.index.name
+                np.save(os.path.join(staging, "index.npy"), data.index.to_numpy())
+                # filled column by column, so no full-size intermediate block is built
+                values = np.lib.format.open_memmap(os.path.join(staging, "values.npy"), mode="w+", dtype=dtype,
+                                                   shape=(len(columns), len(data)))
+                for i, column in enumerate(columns):
+                    if column not in data.columns:
+                        raise ValueError(f"Column {column} not found in data.")
+                    values[i] = data[column].to_numpy()
+                values.flush()
+                del values
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump({"columns": list(columns), "index_name": index_name}, f)
+            if os.path.exists(target):
+                _remove(target)
+            os.rename(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self._names.add(name)
+        return target
+
+    def unpublish(self, name: str):
+        """
+        remove a dataset published by this registry
+        raises: KeyError if this registry did not publish it
+        """
+        if name not in self._names:
+            raise KeyError(name)
+        self._names.discard(name)
+        _remove(os.path.join(self.root, name))
+
+    def names(self):
+        """
+        returns: list - names of the datasets published by this registry
+        """
+        return sorted(self._names)
+
+    def close(self):
+        """
+        remove every dataset published by this registry
+        """
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return f"SharedDatasetRegistry(root={self.root!r}, names={self.names()})"
+
+
+def attach(name: str, root: str = None):
+    """
+    map a published dataset without copying it
+    parameters: name - dataset name given to SharedDatasetRegistry.publish
+    root - directory of the published datasets (default is default_root())
+    returns: CompactOHLCV - read-only, backed by the shared pages
+    raises: KeyError if no dataset of that name is published
+    """
+    directory = os.path.join(root or default_root(), name)
+    try:
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        index_values = np.load(os.path.join(directory, "index.npy"), mmap_mode="r")
+        values = np.load(os.path.join(directory, "values.npy"), mmap_mode="r")
+    except FileNotFoundError:
+        raise KeyError(f"Dataset {name} is not published in {root or default_root()}.") from None
+    return CompactOHLCV(np.asarray(index_values), np.asarray(values), meta["columns"], meta["index_name"])
+
+
+def published(root: str = None):
+    """
+    returns: list - names of every dataset published under root, by any process
+    """
+    root = root or default_root()
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root)
+                  if not name.startswith(".") and os.path.isfile(os.path.join(root, name, "meta.json")))
+
+
+def _remove(directory):
+    # renamed first so a concurrent attach() fails cleanly instead of finding half the files
+    doomed = tempfile.mkdtemp(prefix=".removed.", dir=os.path.dirname(directory))
+    os.rename(directory, os.path.join(doomed, "dataset"))
+    shutil.rmtree(doomed, ignore_errors=True)
+
+
+def _remove_all(root, names, owner_pid):
+    # forked children inherit the registry object but not its datasets
+    if os.getpid() != owner_pid:
+        return
+    for name in list(names):
+        if os.path.exists(os.path.join(root, name)):
+            _remove(os.path.join(root, name))
+    names.clear()
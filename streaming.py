@@ -0,0 +1,478 @@
+import heapq
+import math
+from collections import defaultdict, deque
+
+import numpy as np
+import pandas as pd
+
+from processor import DataProcessor
+
+
+class RollingMoments:
+    def __init__(self, window):
+        """
+        Running mean and variance over the last `window` values (sliding Welford update).
+        NaN values occupy a slot in the window but are left out of the moments, like pandas.
+        :param window: Window size.
+        """
+        self.window = window
+        self.values = deque()
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._removals = 0
+
+    def push(self, value):
+        """
+        Add a value and drop the one that fell out of the window.
+        :param value: New observation.
+        """
+        self.values.append(value)
+        if not math.isnan(value):
+            self._add(value)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if not math.isnan(old):
+                self._remove(old)
+
+    def _add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def _remove(self, value):
+        if self.count == 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (value - self.mean)
+
+        # refresh from the window once per `window` removals to stop rounding drift (amortized O(1))
+        self._removals += 1
+        if self._removals >= self.window:
+            self._removals = 0
+            valid = [v for v in self.values if not math.isnan(v)]
+            self.count = len(valid)
+            self.mean = math.fsum(valid) / self.count if valid else 0.0
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in valid)
+
+    def get_mean(self):
+        """
+        :return: Mean of a full window of valid values, NaN otherwise.
+        """
+        return self.mean if self.count == self.window else np.nan
+
+    def get_std(self):
+        """
+        :return: Sample standard deviation of a full window of valid values, NaN otherwise.
+        """
+        if self.count != self.window or self.count < 2:
+            return np.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1))
+
+
+class RollingMedian:
+    def __init__(self, window):
+        """
+        Running median over the last `window` values using two heaps with lazy deletion.
+        :param window: Window size.
+        """
+        self.window = window
+        self.values = deque()
+        self.low = []   # max-heap of the smaller half (stored negated)
+        self.high = []  # min-heap of the larger half
+        self.low_size = 0
+        self.high_size = 0
+        self.delayed = defaultdict(int)
+
+    def push(self, value):
+        """
+        Add a value and drop the one that fell out of the window.
+        :param value: New observation.
+        """
+        self.values.append(value)
+        if not math.isnan(value):
+            self._insert(value)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if not math.isnan(old):
+                self._erase(old)
+
+    def _insert(self, value):
+        if not self.low or value <= -self.low[0]:
+            heapq.heappush(self.low, -value)
+            self.low_size += 1
+        else:
+            heapq.heappush(self.high, value)
+            self.high_size += 1
+        self._balance()
+
+    def _erase(self, value):
+        self.delayed[value] += 1
+        if value <= -self.low[0]:
+            self.low_size -= 1
+            if value == -self.low[0]:
+                self._prune(self.low, -1)
+        else:
+            self.high_size -= 1
+            if self.high and value == self.high[0]:
+                self._prune(self.high, 1)
+        self._balance()
+
+    def _prune(self, heap, sign):
+        while heap and self.delayed[sign * heap[0]] > 0:
+            self.delayed[sign * heap[0]] -= 1
+            heapq.heappop(heap)
+
+    def _balance(self):
+        if self.low_size > self.high_size + 1:
+            heapq.heappush(self.high, -heapq.heappop(self.low))
+            self.low_size -= 1
+            self.high_size += 1
+            self._prune(self.low, -1)
+        elif self.low_size < self.high_size:
+            heapq.heappush(self.low, -heapq.heappop(self.high))
+            self.low_size += 1
+            self.high_size -= 1
+            self._prune(self.high, 1)
+
+    def get_median(self):
+        """
+        :return: Median of a full window of valid values, NaN otherwise.
+        """
+        if self.low_size + self.high_size != self.window:
+            return np.nan
+        if self.low_size > self.high_size:
+            return -self.low[0]
+        return (-self.low[0] + self.high[0]) / 2
+
+
+class IncrementalStatssummaries:
+    def __init__(self, rolling_window=20, roc_period=10, atr_window=14, metrics=['mean', 'median', 'std'],
+                 price_column='close'):
+        """
+        Stateful counterpart of Statssummaries: every update(bar) costs O(1) amortized
+        (O(log window) for the median) instead of recomputing the whole history.
+        :param rolling_window: Window size for rolling statistics.
+        :param roc_period: Period for RoC calculation.
+        :param atr_window: Window size for ATR calculation.
+        :param metrics: List of rolling metrics to maintain ('mean', 'median', 'std').
+        :param price_column: the name of price column
+        """
+        for metric in metrics:
+            if metric not in ['mean', 'median', 'std']:
+                raise ValueError(f"Unsupported metric: {metric}")
+        self.metrics = list(metrics)
+        self.price_column = price_column
+        self.roc_period = roc_period
+
+        self._moments = RollingMoments(rolling_window)
+        self._median = RollingMedian(rolling_window) if 'median' in metrics else None
+        self._roc_buffer = deque(maxlen=roc_period + 1)  # ring buffer of recent closes
+        self._true_range = RollingMoments(atr_window)
+        self._prev_close = np.nan
+
+    @classmethod
+    def from_statssummaries(cls, analysis_tools, rolling_window=20, roc_period=10, atr_window=14,
+                            metrics=['mean', 'median', 'std']):
+        """
+        Build a calculator with the windows of an existing analysis and warm it up on its history.
+        :param analysis_tools: Statssummaries object.
+        :return: IncrementalStatssummaries ready for new bars.
+        """
+        calculator = cls(rolling_window, roc_period, atr_window, metrics, analysis_tools.price_column)
+        calculator.warm_up(analysis_tools.data)
+        return calculator
+
+    def warm_up(self, data):
+        """
+        Feed historical bars without collecting results.
+        :param data: DataFrame includes market data
+        """
+        has_range = 'high' in data.columns and 'low' in data.columns
+        close = data[self.price_column].to_numpy(dtype=float)
+        high = data['high'].to_numpy(dtype=float) if has_range else np.full(len(data), np.nan)
+        low = data['low'].to_numpy(dtype=float) if has_range else np.full(len(data), np.nan)
+        for c, h, l in zip(close, high, low):
+            self._push(c, h, l)
+
+    def update(self, bar):
+        """
+        Add a new bar and return the latest metrics.
+        :param bar: Mapping (dict or Series row) with the price column and optionally 'high' and 'low'.
+        :return: dict with the current rolling statistics, 'Rate_of_Change(%)' and 'ATR'.
+        """
+        self._push(float(bar[self.price_column]), float(bar.get('high', np.nan)), float(bar.get('low', np.nan)))
+        return self.current()
+
+    def _push(self, close, high, low):
+        self._moments.push(close)
+        if self._median is not None:
+            self._median.push(close)
+        self._roc_buffer.append(close)
+
+        # true range skips the missing previous close on the first bar, like DataFrame.max(axis=1)
+        ranges = [r for r in (high - low, abs(high - self._prev_close), abs(low - self._prev_close)) if not math.isnan(r)]
+        self._true_range.push(max(ranges) if ranges else np.nan)
+        self._prev_close = close
+
+    def current(self):
+        """
+        :return: dict with the current rolling statistics, 'Rate_of_Change(%)' and 'ATR'.
+        """
+        results = {}
+        for metric in self.metrics:
+            if metric == 'mean':
+                results['Rolling_Mean'] = self._moments.get_mean()
+            elif metric == 'median':
+                results['Rolling_Median'] = self._median.get_median()
+            elif metric == 'std':
+                results['Rolling_Std'] = self._moments.get_std()
+
+        roc = np.nan
+        if len(self._roc_buffer) == self.roc_period + 1:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                roc = (np.float64(self._roc_buffer[-1]) / self._roc_buffer[0] - 1) * 100
+        results['Rate_of_Change(%)'] = roc
+        results['ATR'] = self._true_range.get_mean()
+        return results
+
+
+class IncrementalResampler:
+    # missing-bucket value of every aggregate component
+    _NAT = np.iinfo(np.int64).min
+
+    def __init__(self, frequency='D', agg_method='mean', allowed_lateness=None, on_late='raise'):
+        """
+        Resample appended rows without re-aggregating the history. Per bucket it keeps partial aggregates
+        (sum and count for 'mean', sum for 'sum', the last valid value and its time for 'last', plus the first
+        value, max and min for 'ohlc') in growable arrays, so update() costs O(rows + buckets touched).
+        result() equals DataProcessor.resample_data on all rows added so far (without the index freq).
+        :param frequency: Resample frequency, as in resample_data. Fixed-duration bins are anchored at midnight
+            of the first day seen, as resample_data anchors them at the first day of the data.
+        :param agg_method: 'mean', 'sum', 'last' or 'ohlc'.
+        :param allowed_lateness: How far (Timedelta or string) a row may lie behind the latest timestamp added
+            before it; None accepts any out-of-order row.
+        :param on_late: 'raise' or 'drop' for rows later than allowed_lateness; dropped rows are counted in late_rows.
+        """
+        if agg_method not in ['mean', 'sum', 'last', 'ohlc']:
+            raise ValueError(f"Unsupported aggregation method: {agg_method}")
+        if on_late not in ['raise', 'drop']:
+            raise ValueError(f"Unsupported on_late: {on_late}")
+        self.frequency = frequency
+        self.agg_method = agg_method
+        self.allowed_lateness = pd.Timedelta(allowed_lateness) if allowed_lateness is not None else None
+        self.on_late = on_late
+        self.watermark = None
+        self.late_rows = 0
+        self._rule = None
+        self._columns = None
+        self._dtypes = None
+        self._index = None
+        self._labels = None
+        self._parts = {}
+        self._size = 0
+
+    def update(self, rows):
+        """
+        Add rows (any order within the lateness tolerance) and return the buckets they changed.
+        :param rows: DataFrame with a DatetimeIndex and the columns of the first update.
+        :return: DataFrame with the current aggregates of the affected buckets, including new empty buckets.
+        """
+        if not isinstance(rows.index, pd.DatetimeIndex):
+            raise ValueError("Index must be a DatetimeIndex.")
+        columns, rule = self._columns, self._rule
+        if columns is None:
+            if rows.empty:
+                return rows
+            columns = list(rows.columns)
+            rule = DataProcessor._resample_rule(rows.index.min(), self.frequency)
+        missing = [column for column in columns if column not in rows.columns]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in rows.")
+        rows = rows[columns]
+        late, watermark = self._find_late(rows)
+        if late.any():
+            if self.on_late == 'raise':
+                raise ValueError(f"{late.sum()} rows are later than allowed_lateness.")
+            rows = rows[~late]
+        if not rows.empty and 'origin' in rule and rows.index.min() < rule['origin']:
+            raise ValueError("Rows before the first day seen would move the bins; add them in the first update.")
+
+        # every check passed, so the state changes only for an accepted batch
+        if self._columns is None:
+            self._columns, self._rule = columns, rule
+            self._dtypes = rows.dtypes
+            self._index = rows.index[:0]
+        self.late_rows += int(late.sum())
+        self.watermark = watermark
+        if rows.empty:
+            return self._output(slice(0, 0))
+
+        parts = self._aggregate(rows.sort_index(kind='stable'))
+        labels = parts['value'].index.to_numpy().astype(self._index.dtype)
+        old_size = self._size
+        prepended, appended = self._extend(labels[0], labels[-1])
+        start = int(np.searchsorted(self._labels[:self._size], labels[0]))
+        block = slice(start, start + len(labels))
+        self._merge(block, parts)
+
+        # the batch's buckets plus the empty buckets created between it and the existing range
+        first = min(start, old_size + prepended) if appended else start
+        return self._output(slice(first, max(block.stop, prepended)))
+
+    def result(self):
+        """
+        :return: DataFrame resampled over every bucket, equal to resample_data on all rows added so far.
+        """
+        return self._output(slice(0, self._size))
+
+    def _find_late(self, rows):
+        """
+        :return: (boolean array of the rows later than allowed_lateness, watermark after the rows)
+        """
+        times = rows.index.to_numpy()
+        seen = np.maximum.accumulate(times)
+        if self.watermark is not None:
+            seen = np.maximum(seen, self.watermark.to_datetime64())
+        if self.allowed_lateness is not None:
+            late = times < seen - self.allowed_lateness.to_timedelta64()
+        else:
+            late = np.zeros(len(times), dtype=bool)
+        return late, pd.Timestamp(seen[-1]) if len(seen) else self.watermark
+
+    def _aggregate(self, rows):
+        """
+        Partial aggregates of one batch, one DataFrame per component on the batch's bucket labels.
+        """
+        resampler = rows.resample(**self._rule)
+        if self.agg_method in ['mean', 'sum']:
+            parts = {'value': resampler.sum()}
+            if self.agg_method == 'mean':
+                parts['count'] = rows.notna().resample(**self._rule).sum()
+            return parts
+
+        # times of the valid values, so rows of a later batch can still be ordered against them
+        times = pd.DataFrame({column: rows.index.where(rows[column].notna()) for column in self._columns},
+                             index=rows.index).resample(**self._rule)
+        parts = {'value': resampler.last(), 'time': times.max()}
+        if self.agg_method == 'ohlc':
+            parts.update({'first': resampler.first(), 'first_time': times.min(),
+                          'high': resampler.max(), 'low': resampler.min()})
+        return parts
+
+    def _fill(self, name):
+        if name in ['time', 'first_time']:
+            return self._NAT
+        if name == 'count' or (name == 'value' and self.agg_method in ['mean', 'sum']):
+            return 0
+        return np.nan
+
+    def _extend(self, first, last):
+        """
+        Add the bucket labels from first to last that are not stored yet, with empty aggregates.
+        :return: (number of labels prepended, whether labels were appended)
+        """
+        freq = self._rule['rule']
+        if self._labels is None:
+            labels = pd.date_range(first, last, freq=freq).to_numpy().astype(self._index.dtype)
+            self._labels = labels
+            self._parts = {name: np.full((len(labels), len(self._columns)), self._fill(name),
+                                         dtype=np.int64 if name in ['count', 'time', 'first_time'] else np.float64)
+                           for name in self._component_names()}
+            self._size = len(labels)
+            return 0, True
+
+        prepended = 0
+        if first < self._labels[0]:
+            # late rows before the first bucket: rare, so a copy of the state is acceptable
+            head = pd.date_range(first, self._labels[0], freq=freq)[:-1].to_numpy().astype(self._index.dtype)
+            prepended = len(head)
+            self._labels = np.concatenate([head, self._labels])
+            for name, part in self._parts.items():
+                self._parts[name] = np.concatenate([np.full((prepended, part.shape[1]), self._fill(name), part.dtype), part])
+            self._size += prepended
+
+        appended = last > self._labels[self._size - 1]
+        if appended:
+            tail = pd.date_range(self._labels[self._size - 1], last, freq=freq)[1:].to_numpy().astype(self._index.dtype)
+            size = self._size + len(tail)
+            if size > len(self._labels):
+                # grow by doubling, so appending stays amortized O(new buckets)
+                capacity = max(size, 2 * len(self._labels))
+                self._labels = np.resize(self._labels, capacity)
+                for name, part in self._parts.items():
+                    grown = np.full((capacity, part.shape[1]), self._fill(name), part.dtype)
+                    grown[:self._size] = part[:self._size]
+                    self._parts[name] = grown
+            self._labels[self._size:size] = tail
+            self._size = size
+        return prepended, appended
+
+    def _component_names(self):
+        return {'mean': ['value', 'count'], 'sum': ['value'], 'last': ['value', 'time'],
+                'ohlc': ['value', 'time', 'first', 'first_time', 'high', 'low']}[self.agg_method]
+
+    def _merge(self, block, parts):
+        new = {}
+        for name, part in parts.items():
+            if name in ['time', 'first_time']:
+                values = part.to_numpy(dtype='datetime64[ns]').view(np.int64)  # NaT is the minimum int64
+            else:
+                values = part.to_numpy(dtype=np.int64 if name == 'count' else np.float64)
+            new[name] = values
+        old = {name: part[block] for name, part in self._parts.items()}
+
+        if self.agg_method in ['mean', 'sum']:
+            for name in new:
+                old[name] += new[name]
+            return
+        # a later batch wins ties, as a stable sort of all rows would order them
+        newer = (new['time'] != self._NAT) & (new['time'] >= old['time'])
+        np.copyto(old['value'], new['value'], where=newer)
+        np.copyto(old['time'], new['time'], where=newer)
+        if self.agg_method == 'ohlc':
+            earlier = (new['first_time'] != self._NAT) & ((old['first_time'] == self._NAT) | (new['first_time'] < old['first_time']))
+            np.copyto(old['first'], new['first'], where=earlier)
+            np.copyto(old['first_time'], new['first_time'], where=earlier)
+            np.fmax(old['high'], new['high'], out=old['high'])
+            np.fmin(old['low'], new['low'], out=old['low'])
+
+    def _output(self, block):
+        if self._columns is None:
+            return pd.DataFrame()
+        index = pd.DatetimeIndex(self._labels[block] if self._labels is not None else self._index, name=self._index.name)
+
+        def frame(name):
+            return pd.DataFrame(self._parts[name][block] if self._parts else np.empty((0, len(self._columns))),
+                                index=index, columns=self._columns)
+
+        if self.agg_method == 'mean':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = frame('value') / frame('count').where(frame('count') > 0)
+        elif self.agg_method != 'ohlc':
+            result = frame('value')
+        else:
+            fields = {'open': frame('first'), 'high': frame('high'), 'low': frame('low'), 'close': frame('value')}
+            result = pd.concat({column: pd.DataFrame({field: values[column] for field, values in fields.items()})
+                                for column in self._columns}, axis=1)
+        return self._restore_dtypes(result)
+
+    def _restore_dtypes(self, frame):
+        """
+        Give the output the dtypes resample_data would: float32 stays float32, and integer columns stay
+        integers for 'sum' and wherever no bucket is empty for 'last' and 'ohlc'.
+        """
+        if self.agg_method == 'mean':
+            kinds = {column: dtype for column, dtype in self._dtypes.items() if dtype == np.float32}
+        else:
+            kinds = {column: dtype for column, dtype in self._dtypes.items() if dtype == np.float32 or dtype.kind in 'iub'}
+        for column, dtype in kinds.items():
+            outputs = [column] if self.agg_method != 'ohlc' else [(column, field) for field in ['open', 'high', 'low', 'close']]
+            for output in outputs:
+                if dtype.kind == 'f' or self.agg_method == 'sum' or frame[output].notna().all():
+                    frame[output] = frame[output].astype(dtype)
+        return frame
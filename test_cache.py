@@ -0,0 +1,94 @@
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+import numpy as np
+from cache import DatasetCache
+from processor import DataProcessor
+
+
+class TestDatasetCache(unittest.TestCase):
+    def setUp(self):
+        """
+        set up a temporary directory with a small price file
+        """
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, "000001.csv")
+        self.cache_dir = os.path.join(self.directory, "cache")
+        self.sample_data = pd.DataFrame({
+            "close": np.linspace(10, 20, 50),
+            "volume": np.arange(50),
+        }, index=pd.date_range("2024-01-01", periods=50, freq="D", name="date"))
+        self.sample_data.to_csv(self.file_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_data_hits_cache(self):
+        cache = DatasetCache(self.cache_dir)
+        first = DataProcessor(self.file_path, file_format="csv", cache=cache).load_data()
+        second = DataProcessor(self.file_path, file_format="csv", cache=cache).load_data()
+
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["entries"], 1)
+        pd.testing.assert_frame_equal(second, first)
+        base = second["close"].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        self.assertIsInstance(base, np.memmap)
+
+    def test_modified_file_invalidates(self):
+        processor = DataProcessor(self.file_path, file_format="csv", cache=self.cache_dir)
+        processor.load_data()
+        time.sleep(0.01)
+        self.sample_data.iloc[:10].to_csv(self.file_path)
+        data = processor.load_data()
+
+        self.assertEqual(len(data), 10)
+        self.assertEqual(processor.cache.misses, 2)
+        self.assertEqual(processor.cache.stats()["entries"], 1)
+
+    def test_cached_frame_is_writable_copy_on_write(self):
+        cache = DatasetCache(self.cache_dir)
+        DataProcessor(self.file_path, cache=cache).load_data()
+        data = DataProcessor(self.file_path, cache=cache).load_data()
+        data.iloc[0, 0] = -1.0
+        reloaded = DataProcessor(self.file_path, cache=cache).load_data()
+        self.assertEqual(reloaded.iloc[0, 0], 10.0)
+
+    def test_eviction(self):
+        cache = DatasetCache(self.cache_dir, max_bytes=3000)
+        for i in range(3):
+            cache.put(f"key{i}", self.sample_data)
+            time.sleep(0.01)
+        self.assertLessEqual(cache.stats()["bytes"], 3000)
+        self.assertIsNone(cache.get("key0"))
+        self.assertIsNotNone(cache.get("key2"))
+
+    def test_concurrent_writers_under_eviction(self):
+        paths = []
+        for i in range(40):
+            path = os.path.join(self.directory, f"{i:06d}.csv")
+            (self.sample_data + i).to_csv(path)
+            paths.append(path)
+        # room for about five entries, so writers keep evicting each other's entries
+        cache = DatasetCache(self.cache_dir, max_bytes=6000)
+        for _ in range(5):
+            frames = asyncio.run(DataProcessor.aload_many(paths, concurrency=16, cache=cache))
+            for i, path in enumerate(paths):
+                pd.testing.assert_frame_equal(frames[path], (self.sample_data + i).astype(frames[path].dtypes),
+                                              check_freq=False)
+        self.assertLessEqual(cache.stats()["bytes"], 6000)
+        self.assertFalse([name for name in os.listdir(self.cache_dir) if name.startswith(".")])
+
+    def test_object_columns_not_cached(self):
+        frame = self.sample_data.assign(name="abc")
+        self.assertFalse(DatasetCache(self.cache_dir).put("key", frame))
+
+
+if __name__ == "__main__":
+    unittest.main()
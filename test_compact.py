@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+import pandas as pd
+from compact import CompactOHLCV
+from Statssummaries import Statssummaries
+
+
+class TestCompactOHLCV(unittest.TestCase):
+    def setUp(self):
+        """
+        set up a random-walk OHLCV frame
+        """
+        rng = np.random.default_rng(7)
+        close = 100 + np.cumsum(rng.normal(0, 1, 500))
+        self.data = pd.DataFrame({
+            "open": close + rng.normal(0, 0.5, 500),
+            "high": close + 1 + rng.random(500),
+            "low": close - 1 - rng.random(500),
+            "close": close,
+            "volume": rng.integers(1000, 100000, 500).astype(float),
+        }, index=pd.date_range("2024-01-01", periods=500, freq="D", name="date"))
+        self.compact = CompactOHLCV.from_frame(self.data)
+
+    def test_layout(self):
+        self.assertEqual(self.compact.values.dtype, np.float32)
+        self.assertEqual(self.compact.values.shape, (5, 500))
+        self.assertTrue(self.compact.values.flags.c_contiguous)
+        self.assertEqual(self.compact.nbytes, 500 * (5 * 4 + 8))
+        self.assertLess(self.compact.nbytes, self.data.memory_usage().sum() / 1.5)
+        pd.testing.assert_index_equal(self.compact.index, self.data.index, exact=False)
+
+    def test_read_only(self):
+        with self.assertRaises(ValueError):
+            self.compact.values[0, 0] = 0.0
+        with self.assertRaises(ValueError):
+            self.compact["close"].to_numpy()[0] = 0.0
+        frame = self.compact.to_frame()
+        frame.iloc[0, 0] = 0.0
+        self.assertNotEqual(self.compact.values[0, 0], 0.0)
+
+    def test_column_access(self):
+        close = self.compact["close"]
+        self.assertIs(close, self.compact["close"])
+        self.assertTrue(np.shares_memory(close.to_numpy(), self.compact.values))
+        np.testing.assert_array_equal(close.to_numpy(), self.data["close"].to_numpy(dtype=np.float32))
+        self.assertIn("high", self.compact)
+        with self.assertRaises(KeyError):
+            self.compact["missing"]
+
+    def test_summary_matches_rounded_float64(self):
+        """
+        metrics on the compact store equal the float64 metrics of the float32-rounded inputs
+        """
+        analysis = Statssummaries(self.compact)
+        self.assertIs(analysis.data, self.compact)
+        result = analysis.summary(rolling_window=20, roc_period=10, atr_window=14)
+        expected = Statssummaries(self.data.astype(np.float32).astype(np.float64)).summary(
+            rolling_window=20, roc_period=10, atr_window=14)
+
+        metrics = ["Rolling_Mean", "Rolling_Std", "Rate_of_Change(%)", "ATR"]
+        for column in metrics:
+            self.assertEqual(result[column].dtype, np.float64)
+        pd.testing.assert_frame_equal(result[metrics], expected[metrics], check_freq=False)
+        # and stay within float32 rounding of the unrounded input
+        exact = Statssummaries(self.data).summary(rolling_window=20, roc_period=10, atr_window=14)
+        np.testing.assert_allclose(result["Rolling_Mean"], exact["Rolling_Mean"], rtol=1e-6)
+
+    def test_from_chunks(self):
+        chunks = [self.data.iloc[i:i + 128] for i in range(0, len(self.data), 128)]
+        compact = CompactOHLCV.from_chunks(chunks)
+        np.testing.assert_array_equal(compact.values, self.compact.values)
+        pd.testing.assert_index_equal(compact.index, self.data.index)
+
+    def test_missing_column(self):
+        with self.assertRaises(ValueError):
+            CompactOHLCV.from_frame(self.data, columns=["close", "adj_close"])
+        with self.assertRaises(ValueError):
+            CompactOHLCV.from_frame(self.data.reset_index())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+import instrumentation
+from instrumentation import instrument, MemorySink, JsonLinesSink, ProfileSink
+from processor import DataProcessor
+from Statssummaries import Statssummaries
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        """
+        set up a processor on the sample file
+        """
+        self.processor = DataProcessor("000001.csv", file_format="csv")
+
+    def test_disabled_records_nothing(self):
+        sink = MemorySink()
+        with instrument(sink):
+            self.processor.load_data()
+        self.assertEqual(len(sink.records), 1)
+
+        # outside the block no record is even built
+        with mock.patch.object(instrumentation, "_rows", side_effect=AssertionError("record built")):
+            self.processor.load_data()
+        self.assertEqual(len(sink.records), 1)
+        self.assertEqual(instrumentation._sinks, [])
+        self.assertEqual(DataProcessor.load_data.__name__, "load_data")
+
+    def test_memory_sink(self):
+        with instrument(trace_memory=True) as sink:
+            data = self.processor.load_data()
+            Statssummaries(data).summary()
+
+        names = [record["name"] for record in sink.records]
+        self.assertIn("DataProcessor.load_data", names)
+        self.assertIn("Statssummaries.summary", names)
+        load = sink.records[names.index("DataProcessor.load_data")]
+        self.assertEqual(load["rows"], len(data))
+        self.assertGreater(load["memory_delta"], 0)
+
+        # calls made by summary() are nested one level below it
+        summary = sink.records[names.index("Statssummaries.summary")]
+        self.assertEqual(summary["depth"], 0)
+        self.assertEqual(sink.records[names.index("Statssummaries.calculate_rate_of_change")]["depth"], 1)
+        self.assertEqual(sink.stats()["Statssummaries.summary"]["calls"], 1)
+
+        # the sink is detached after the block
+        self.processor.load_data()
+        self.assertEqual(len(sink.records), len(names))
+
+    def test_error_is_recorded(self):
+        self.processor.load_data()
+        with instrument() as sink:
+            with self.assertRaises(ValueError):
+                self.processor.resample_data("D", "median")
+        self.assertEqual(sink.records[0]["error"], "ValueError")
+
+    def test_json_lines_and_profile(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        log_path = os.path.join(directory, "calls.jsonl")
+        profile_path = os.path.join(directory, "run.prof")
+        profile = ProfileSink(profile_path)
+        with instrument(JsonLinesSink(log_path), profile):
+            self.processor.load_data()
+            self.processor.smooth_data("close")
+
+        with open(log_path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record["name"] for record in records], ["DataProcessor.load_data", "DataProcessor.smooth_data"])
+        self.assertIsNone(records[0]["memory_delta"])
+        self.assertTrue(os.path.exists(profile_path))
+        self.assertIn("read_csv", profile.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import pandas as pd
+import numpy as np
+from kernels import average_true_range, smooth_true_range, true_range
+
+
+class TestKernels(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup bars for three symbols side by side, with a missing bar in the second one.
+        """
+        rng = np.random.default_rng(7)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, (300, 3)), axis=0)
+        spread = np.abs(rng.normal(0, 0.5, (300, 3)))
+        self.high = self.close + spread
+        self.low = self.close - spread
+        self.high[40, 1] = self.low[40, 1] = self.close[40, 1] = np.nan
+
+    def reference_true_range(self, column):
+        """
+        The true range as Statssummaries computed it before the kernels: three Series and a row-wise max.
+        """
+        high, low = pd.Series(self.high[:, column]), pd.Series(self.low[:, column])
+        prev_close = pd.Series(self.close[:, column]).shift()
+        return pd.concat([high - low, np.abs(high - prev_close), np.abs(low - prev_close)], axis=1).max(axis=1)
+
+    def test_true_range_matches_pandas(self):
+        """
+        Test every column of a 2-D true range matches the pandas reference, NaN handling included.
+        """
+        tr = true_range(self.high, self.low, self.close)
+        for column in range(3):
+            np.testing.assert_allclose(tr[:, column], self.reference_true_range(column), rtol=1e-15)
+            np.testing.assert_allclose(true_range(self.high[:, column], self.low[:, column], self.close[:, column]),
+                                       tr[:, column], rtol=0)
+
+    def test_sma_matches_rolling_mean(self):
+        """
+        Test the simple moving average matches rolling(window).mean() and is written into out.
+        """
+        out = np.empty_like(self.close)
+        result = average_true_range(self.high, self.low, self.close, 14, out=out)
+        self.assertIs(result, out)
+        for column in range(3):
+            expected = self.reference_true_range(column).rolling(14).mean()
+            np.testing.assert_allclose(out[:, column], expected, rtol=1e-10)
+        self.assertTrue(np.isnan(smooth_true_range(np.ones(5), 6)).all())
+
+    def test_wilder_matches_recursion(self):
+        """
+        Test Wilder smoothing matches the recursion seeded with the mean of the first window.
+        """
+        window = 10
+        tr = true_range(self.high[:, 0], self.low[:, 0], self.close[:, 0])
+        expected = np.full(len(tr), np.nan)
+        expected[window - 1] = tr[:window].mean()
+        for i in range(window, len(tr)):
+            expected[i] = expected[i - 1] + (tr[i] - expected[i - 1]) / window
+        np.testing.assert_allclose(smooth_true_range(tr, window, 'wilder'), expected, rtol=1e-12)
+        atr = average_true_range(self.high, self.low, self.close, window, smoothing='wilder')
+        np.testing.assert_allclose(atr[:, 0], expected, rtol=1e-12)
+        with self.assertRaises(ValueError):
+            smooth_true_range(tr, window, 'ema')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import os
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+from pipeline import iter_chunk_outcomes, iter_pipeline, run_pipeline, process_file, render_universe, resolve_sources
+from Statssummaries import Statssummaries
+
+
+def exit_on_three(chunk, scale):
+    """
+    worker entry point whose process dies on the item 3
+    """
+    if 3 in chunk:
+        os._exit(1)
+    return [(item, True, item * scale) for item in chunk]
+
+
+class TestPipeline(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        write three small ticker files and one broken file to a temporary directory
+        """
+        cls.directory = tempfile.mkdtemp()
+        for i in range(3):
+            close = np.linspace(10, 20, 30) + i
+            frame = pd.DataFrame({
+                "date": pd.date_range("2024-01-01", periods=30, freq="D"),
+                "close": close,
+                "high": close + 1,
+                "low": close - 1,
+            })
+            frame.to_csv(os.path.join(cls.directory, f"00000{i}.csv"), index=False)
+        with open(os.path.join(cls.directory, "broken.csv"), "w") as f:
+            f.write("date,value\n2024-01-01,1\n")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_process_file(self):
+        summary = process_file(os.path.join(self.directory, "000000.csv"), rolling_window=3)
+        self.assertEqual(len(summary), 30)
+        self.assertIn("ATR", summary.columns)
+        self.assertIn("Smoothed", summary.columns)
+        self.assertIn("Outlier", summary.columns)
+
+    def test_run_pipeline_collects_failures(self):
+        result = run_pipeline(self.directory, n_workers=2, rolling_window=3)
+        self.assertEqual(len(result.results), 3)
+        self.assertEqual(list(result.failures), [os.path.join(self.directory, "broken.csv")])
+        self.assertIn("Column close not found", result.failures[os.path.join(self.directory, "broken.csv")])
+
+    def test_run_pipeline_writes_output(self):
+        output_dir = os.path.join(self.directory, "out")
+        result = run_pipeline(os.path.join(self.directory, "0*.csv"), n_workers=2, chunk_size=2,
+                              output_dir=output_dir)
+        self.assertEqual(len(result.failures), 0)
+        self.assertEqual(sorted(os.listdir(output_dir)), ["000000.csv", "000001.csv", "000002.csv"])
+
+    def test_duplicate_names_are_rejected(self):
+        other = os.path.join(self.directory, "other")
+        os.makedirs(other, exist_ok=True)
+        self.addCleanup(shutil.rmtree, other)
+        shutil.copy(os.path.join(self.directory, "000000.csv"), other)
+        sources = [os.path.join(self.directory, "0*.csv"), other]
+        with self.assertRaises(ValueError):
+            run_pipeline(sources, n_workers=1, output_dir=os.path.join(self.directory, "collide"))
+        with self.assertRaises(ValueError):
+            render_universe(sources, os.path.join(self.directory, "collide"), n_workers=1)
+        # summaries kept in memory are keyed by full path, so the same names are fine there
+        self.assertEqual(len(run_pipeline(sources, n_workers=1, rolling_window=3).results), 4)
+
+    def test_serial_matches_parallel(self):
+        serial = run_pipeline(resolve_sources(self.directory), n_workers=1)
+        parallel = run_pipeline(resolve_sources(self.directory), n_workers=2)
+        for path, summary in serial.results.items():
+            pd.testing.assert_frame_equal(summary, parallel.results[path])
+
+    def test_iter_pipeline_streams_outcomes(self):
+        outcomes = iter_pipeline(self.directory, n_workers=2, rolling_window=3)
+        self.assertNotIsInstance(outcomes, (list, dict))
+        collected = {path: (ok, payload) for path, ok, payload in outcomes}
+        expected = run_pipeline(self.directory, n_workers=1, rolling_window=3)
+        self.assertEqual(sorted(path for path, (ok, _) in collected.items() if ok), sorted(expected.results))
+        for path, summary in expected.results.items():
+            pd.testing.assert_frame_equal(collected[path][1], summary)
+
+    def test_dead_worker_does_not_stop_the_run(self):
+        outcomes = list(iter_chunk_outcomes(exit_on_three, [[i] for i in range(6)], (10,), n_workers=2, max_pending=2))
+        self.assertEqual(sorted(item for item, _, _ in outcomes), list(range(6)))
+        succeeded = {item: payload for item, ok, payload in outcomes if ok}
+        self.assertNotIn(3, succeeded)
+        self.assertTrue(all(payload == item * 10 for item, payload in succeeded.items()))
+        # chunks submitted after the crash run in a fresh pool
+        self.assertIn(5, succeeded)
+        failures = [payload for _, ok, payload in outcomes if not ok]
+        self.assertTrue(all("BrokenProcessPool" in payload for payload in failures))
+
+    def test_render_universe(self):
+        output_dir = os.path.join(self.directory, "charts")
+        result = render_universe(self.directory, output_dir, n_workers=2, chunk_size=2, window_short=3,
+                                 window_long=5, atr_window=3, period=2, freq=4)
+        self.assertEqual(sorted(result.results), ["000000", "000001", "000002"])
+        self.assertEqual(list(result.failures), ["broken"])
+        self.assertEqual(len(os.listdir(output_dir)), 12)
+        self.assertEqual(result.results["000001"]["volatility"], os.path.join(output_dir, "000001_volatility.png"))
+
+    def test_render_universe_from_objects(self):
+        output_dir = os.path.join(self.directory, "svg")
+        frame = pd.read_csv(os.path.join(self.directory, "000000.csv"), index_col="date", parse_dates=True)
+        result = render_universe({"a": Statssummaries(frame), "b": Statssummaries(frame * 2)}, output_dir,
+                                 n_workers=1, image_format="svg", window_short=3, window_long=5)
+        self.assertEqual(len(result.failures), 0)
+        self.assertTrue(os.path.isfile(os.path.join(output_dir, "b_seasonal_decomposition.svg")))
+        with self.assertRaises(ValueError):
+            render_universe([], output_dir, image_format="gif")
+
+
+if __name__ == "__main__":
+    unittest.main()
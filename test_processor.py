@@ -2,7 +2,14 @@ import unittest
 import pandas as pd
 import numpy as np
 import os
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
 from io import StringIO
+from processor import DataProcessor
+
 class TestDataProcessor(unittest.TestCase):
 
     @classmethod
@@ -61,5 +68,274 @@ class TestDataProcessor(unittest.TestCase):
         self.assertTrue(os.path.exists(output_path))  
         os.remove(output_path)  
 
+class TestChunkedProcessing(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        close = rng.normal(100, 5, 500)
+        data = pd.DataFrame({
+            "close": close,
+            "high": close + 1,
+            "low": close - 1,
+            "volume": rng.uniform(100, 900, 500),
+        }, index=pd.date_range("2024-01-01 09:30", periods=500, freq="37min", name="date"))
+        data.iloc[40:90, 1] = np.nan
+        cls.file_path = "test_chunks.csv"
+        data.to_csv(cls.file_path)
+        cls.processor = DataProcessor(cls.file_path, file_format="csv")
+        cls.processor.data = pd.concat(cls.processor.iter_chunks(chunksize=1000))
+
+    @classmethod
+    def tearDownClass(cls):
+        if os.path.exists(cls.file_path):
+            os.remove(cls.file_path)
+
+    def test_iter_chunks(self):
+        chunks = list(self.processor.iter_chunks(chunksize=120))
+        self.assertEqual([len(chunk) for chunk in chunks], [120, 120, 120, 120, 20])
+        self.assertIsInstance(chunks[0].index, pd.DatetimeIndex)
+        self.assertTrue((chunks[0].dtypes == np.float32).all())
+
+    def test_resample_chunks(self):
+        for frequency in ["2h", "2D", "W"]:
+            for agg_method in ["mean", "sum", "last"]:
+                chunks = self.processor.iter_chunks(chunksize=73)
+                resampled = pd.concat(self.processor.resample_chunks(frequency, agg_method, chunks=chunks))
+                expected = self.processor.resample_data(frequency=frequency, agg_method=agg_method)
+                pd.testing.assert_frame_equal(resampled, expected, check_freq=False)
+
+    def test_smooth_chunks(self):
+        chunks = self.processor.iter_chunks(chunksize=50)
+        smoothed = pd.concat(self.processor.smooth_chunks(column="close", window_size=7, chunks=chunks))
+        expected = self.processor.smooth_data(column="close", window_size=7)
+        pd.testing.assert_series_equal(smoothed, expected)
+
+    def test_smooth_chunks_smaller_than_window(self):
+        for chunksize in [1, 2, 5]:
+            with self.subTest(chunksize=chunksize):
+                chunks = self.processor.iter_chunks(chunksize=chunksize)
+                smoothed = pd.concat(self.processor.smooth_chunks(column="close", window_size=7, chunks=chunks))
+                expected = self.processor.smooth_data(column="close", window_size=7)
+                pd.testing.assert_series_equal(smoothed, expected)
+
+    def test_detect_outliers_rolling(self):
+        processor = DataProcessor(self.file_path, file_format="csv")
+        processor.data = self.processor.data.astype(np.float64)
+        processor.data.iloc[300, 0] = 1000.0
+        for method in ["rolling_zscore", "rolling_iqr"]:
+            outliers = processor.detect_outliers(column="close", method=method, threshold=3.0, window=30)
+            self.assertTrue(outliers.iloc[300])
+            self.assertFalse(outliers.iloc[:29].any())
+            self.assertLess(outliers.sum(), 25)
+
+        close = processor.data["close"]
+        rolling = close.rolling(30)
+        z_scores = (close - rolling.mean()) / rolling.std()
+        expected = z_scores.abs() > 3.0
+        pd.testing.assert_series_equal(processor.detect_outliers("close", "rolling_zscore", 3.0, 30), expected)
+        Q1, Q3 = rolling.quantile(0.25), rolling.quantile(0.75)
+        expected = (close < Q1 - 1.5 * (Q3 - Q1)) | (close > Q3 + 1.5 * (Q3 - Q1))
+        pd.testing.assert_series_equal(processor.detect_outliers("close", "rolling_iqr", window=30), expected)
+
+        iqr = processor.detect_outliers(column="close", method="iqr")
+        Q1 = processor.data["close"].quantile(0.25)
+        Q3 = processor.data["close"].quantile(0.75)
+        expected = ~processor.data["close"].between(Q1 - 1.5 * (Q3 - Q1), Q3 + 1.5 * (Q3 - Q1))
+        pd.testing.assert_series_equal(iqr, expected)
+
+    def test_detect_outliers_multi_column(self):
+        processor = DataProcessor(self.file_path, file_format="csv")
+        processor.data = self.processor.data.astype(np.float64)
+        processor.data.iloc[300, 0] = 1000.0
+        processor.data.iloc[120, 3] = -50.0
+        columns = ["close", "high", "volume"]
+        for method in ["zscore", "iqr", "rolling_zscore", "rolling_iqr"]:
+            mask = processor.detect_outliers(columns, method=method, threshold=3.0, window=30)
+            self.assertEqual(list(mask.columns), columns)
+            for column in columns:
+                expected = processor.detect_outliers(column, method=method, threshold=3.0, window=30)
+                np.testing.assert_array_equal(mask[column].to_numpy(), expected.to_numpy())
+        with self.assertRaises(ValueError):
+            processor.detect_outliers(["close", "missing"])
+
+    def test_clean_outliers(self):
+        processor = DataProcessor(self.file_path, file_format="csv")
+        processor.data = self.processor.data.astype(np.float64)
+        processor.data.iloc[300, 0] = 1000.0
+        processor.data.iloc[0, 3] = 1e6
+        dropped, mask = processor.clean_outliers(["close", "volume"], action="drop")
+        self.assertEqual(mask.sum().to_dict(), {"close": 1, "volume": 1})
+        self.assertEqual(len(dropped), len(processor.data) - 2)
+
+        clipped, mask = processor.clean_outliers(["close", "volume"], action="clip")
+        close = processor.data["close"]
+        self.assertAlmostEqual(clipped["close"].iloc[300], close.mean() + 3 * close.std())
+        pd.testing.assert_series_equal(clipped["close"][~mask["close"]], close[~mask["close"]])
+        pd.testing.assert_series_equal(clipped["high"], processor.data["high"])
+
+        filled, _ = processor.clean_outliers(["close", "volume"], action="ffill")
+        self.assertEqual(filled["close"].iloc[300], close.iloc[299])
+        self.assertTrue(np.isnan(filled["volume"].iloc[0]))
+
+        interpolated, _ = processor.clean_outliers(["close"], action="interpolate")
+        self.assertAlmostEqual(interpolated["close"].iloc[300], (close.iloc[299] + close.iloc[301]) / 2)
+        self.assertEqual(processor.data["close"].iloc[300], 1000.0)
+
+        # the high column has missing values; detect_outliers flags them with iqr, cleaning leaves them alone
+        self.assertTrue(processor.detect_outliers("high", method="iqr").iloc[40:90].all())
+        processor.data.iloc[100, 1] = 1e6
+        for action in ["drop", "clip", "ffill", "interpolate"]:
+            cleaned, mask = processor.clean_outliers(["high"], method="iqr", action=action)
+            self.assertTrue(mask["high"].iloc[100])
+            self.assertFalse(mask["high"].iloc[40:90].any())
+            self.assertEqual(len(cleaned), len(processor.data) - mask["high"].sum() * (action == "drop"))
+            self.assertTrue(cleaned["high"].iloc[40:90].isna().all())
+        with self.assertRaises(ValueError):
+            processor.clean_outliers(action="winsorize")
+
+    def test_unsupported_chunk_format(self):
+        with self.assertRaises(ValueError):
+            DataProcessor(self.file_path, file_format="parquet").iter_chunks()
+        with self.assertRaises(ValueError):
+            self.processor.resample_chunks(agg_method="median")
+
+
+class TestTimeRange(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(1)
+        close = 100 + np.cumsum(rng.normal(0, 1, 2000))
+        cls.data = pd.DataFrame({"close": close, "high": close + 1, "low": close - 1},
+                                index=pd.date_range("2023-06-01", periods=2000, freq="6h", name="date"))
+        cls.file_path = "test_range.csv"
+        cls.data.to_csv(cls.file_path)
+        cls.expected = pd.read_csv(cls.file_path, parse_dates=True, index_col=0).loc["2024-02-10":"2024"]
+
+    @classmethod
+    def tearDownClass(cls):
+        if os.path.exists(cls.file_path):
+            os.remove(cls.file_path)
+
+    def test_load_range_from_file(self):
+        processor = DataProcessor(self.file_path, file_format="csv")
+        for chunksize in [100, 5000]:
+            selected = processor.load_range("2024-02-10", "2024", chunksize=chunksize)
+            pd.testing.assert_frame_equal(selected, self.expected)
+        self.assertIsNone(processor.data)
+
+    def test_load_range_from_cache_keeps_data_unloaded(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        processor = DataProcessor(self.file_path, file_format="csv", cache=os.path.join(directory, "cache"))
+        for _ in range(2):
+            pd.testing.assert_frame_equal(processor.load_range("2024-02-10", "2024"), self.expected, check_freq=False)
+        weekly = processor.between("2024-02-10", "2024").resample_data("W", "last").collect()
+        pd.testing.assert_frame_equal(weekly, self.expected.resample("W").last(), check_freq=False)
+        self.assertIsNone(processor.data)
+        self.assertEqual(processor.cache.hits, 2)
+
+    def test_load_range_from_loaded_data(self):
+        processor = DataProcessor(self.file_path, file_format="csv")
+        processor.load_data()
+        pd.testing.assert_frame_equal(processor.load_range("2024-02-10", "2024"), self.expected)
+        pd.testing.assert_frame_equal(processor.load_range(end="2023-06-01"), processor.data.iloc[:4])
+        # an unsorted index is filtered with a mask instead of bisected
+        processor.data = processor.data.iloc[::-1]
+        pd.testing.assert_frame_equal(processor.load_range("2024-02-10", "2024"), self.expected.iloc[::-1])
+
+    def test_between_is_lazy(self):
+        view = DataProcessor("missing.csv", file_format="csv").between("2024-01-01", "2024-03-31").resample_data("W", "last")
+        self.assertEqual(view.steps, (("resample_data", ("W", "last")),))
+        self.assertIn("resample_data", repr(view))
+        with self.assertRaises(FileNotFoundError):
+            view.collect()
+        with self.assertRaises(ValueError):
+            view.resample_data("D", "median")
+
+    def test_between_runs_plan_on_slice(self):
+        processor = DataProcessor(self.file_path, file_format="csv")
+        view = processor.between("2024-02-10", "2024")
+        full = DataProcessor(self.file_path, file_format="csv")
+        full.data = self.expected
+        pd.testing.assert_frame_equal(view.resample_data("D", "mean").collect(), full.resample_data("D", "mean"))
+        pd.testing.assert_series_equal(view.detect_outliers("close", method="iqr"), full.detect_outliers("close", method="iqr"))
+        pd.testing.assert_series_equal(view.smooth_data("close", 4), full.smooth_data("close", 4))
+        weekly = view.resample_data("D", "last").resample_data("W", "sum").collect()
+        self.assertEqual(weekly.index[0], pd.Timestamp("2024-02-11"))
+
+
+class SlowDataProcessor(DataProcessor):
+    """
+    stand-in for a slow network filesystem: every read waits `latency` seconds and counts concurrent reads
+    """
+    latency = 0.2
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+
+    def read_bytes(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        time.sleep(self.latency)
+        with cls.lock:
+            cls.active -= 1
+        return super().read_bytes()
+
+
+class TestAsyncLoading(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        data = pd.read_csv("000001.csv", index_col=0, nrows=200)
+        self.paths = []
+        for i in range(8):
+            path = os.path.join(self.directory, f"{i:06d}.csv")
+            data.to_csv(path)
+            self.paths.append(path)
+        SlowDataProcessor.max_active = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_aload_data_matches_load_data(self):
+        expected = DataProcessor(self.paths[0], file_format="csv").load_data()
+        processor = DataProcessor(self.paths[0], file_format="csv")
+        result = asyncio.run(processor.aload_data())
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertIs(processor.data, result)
+
+    def test_aload_many_overlaps_reads(self):
+        start = time.perf_counter()
+        frames = asyncio.run(SlowDataProcessor.aload_many(self.paths, concurrency=8))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(list(frames), self.paths)
+        pd.testing.assert_frame_equal(frames[self.paths[3]], DataProcessor(self.paths[3]).load_data())
+        # eight sequential reads would take 8 * latency
+        self.assertLess(elapsed, 4 * SlowDataProcessor.latency)
+
+    def test_aload_many_bounded(self):
+        asyncio.run(SlowDataProcessor.aload_many(self.paths, concurrency=3))
+        self.assertLessEqual(SlowDataProcessor.max_active, 3)
+        self.assertGreater(SlowDataProcessor.max_active, 1)
+
+    def test_aload_many_errors_and_cache(self):
+        missing = os.path.join(self.directory, "missing.csv")
+        frames = asyncio.run(DataProcessor.aload_many(self.paths[:2] + [missing], return_exceptions=True))
+        self.assertIsInstance(frames[missing], FileNotFoundError)
+        with self.assertRaises(FileNotFoundError):
+            asyncio.run(DataProcessor.aload_many([missing] + self.paths[:2]))
+
+        cache_dir = os.path.join(self.directory, "cache")
+        first = asyncio.run(SlowDataProcessor.aload_many(self.paths, cache=cache_dir))
+        start = time.perf_counter()
+        second = asyncio.run(SlowDataProcessor.aload_many(self.paths, cache=cache_dir, concurrency=1))
+        self.assertLess(time.perf_counter() - start, SlowDataProcessor.latency)
+        pd.testing.assert_frame_equal(second[self.paths[0]], first[self.paths[0]])
+
+
 if __name__ == "__main__":
     unittest.main()
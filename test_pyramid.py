@@ -0,0 +1,76 @@
+import unittest
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from processor import DataProcessor
+from pyramid import OHLCVPyramid
+
+
+class TestOHLCVPyramid(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        set up a year of weekday session minute bars with missing opens
+        """
+        rng = np.random.default_rng(0)
+        index = pd.date_range("2004-03-03 09:31", periods=400000, freq="min", name="date")
+        index = index[(index.hour >= 9) & (index.hour < 16) & (index.dayofweek < 5)]
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, len(index))))
+        cls.data = pd.DataFrame({"open": close, "high": close + 0.1, "low": close - 0.1, "close": close,
+                                 "volume": rng.integers(1, 100, len(index)).astype(float)}, index=index)
+        cls.data.iloc[::97, 0] = np.nan
+        cls.processor = DataProcessor("unused.csv")
+        cls.processor.data = cls.data
+        cls.pyramid = cls.processor.build_pyramid()
+
+    def expected(self, level):
+        rule = OHLCVPyramid._rule(self.data.index[0], level)
+        bars = self.data.resample(**rule).agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+        return bars[self.data["close"].resample(**rule).size().to_numpy() > 0]
+
+    def test_levels_match_direct_resample(self):
+        self.assertEqual(list(self.pyramid.levels), ["5min", "1h", "1D", "W-MON", "MS"])
+        for level in self.pyramid.levels:
+            pd.testing.assert_frame_equal(self.pyramid.query(level), self.expected(level), check_freq=False)
+        # daily bars are the same as resample_data on the session days
+        daily = self.processor.resample_data("D", "ohlc")["close"]["close"].dropna()
+        np.testing.assert_array_equal(self.pyramid.query("1D")["close"].to_numpy(), daily.to_numpy())
+
+    def test_each_level_derives_from_a_nesting_level(self):
+        rules = {level: OHLCVPyramid._rule(self.data.index[0], level) for level in self.pyramid.levels}
+        parents = [OHLCVPyramid._parent(level, list(rules)[:i], rules, self.data.index[0], self.data.index[-1])
+                   for i, level in enumerate(rules)]
+        self.assertEqual(parents, [None, "5min", "1h", "1D", "1D"])
+
+    def test_range_query(self):
+        weekly = self.pyramid.query("W-MON", "2004-06", "2004-09")
+        self.assertEqual(weekly.index[0], pd.Timestamp("2004-06-07"))
+        self.assertEqual(weekly.index[-1], pd.Timestamp("2004-09-27"))
+        pd.testing.assert_frame_equal(weekly, self.expected("W-MON").loc["2004-06":"2004-09"], check_freq=False)
+        self.assertTrue(self.pyramid.query("1D", "2030", "2031").empty)
+
+        level = self.pyramid.select_level("2004-06-01", "2004-06-04", max_bars=500)
+        self.assertEqual(level, "5min")
+        self.assertLessEqual(len(self.pyramid.query(start="2004-06-01", end="2004-06-04", max_bars=500)), 500)
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            self.processor.build_pyramid(levels=["1h", "1D"], path=directory)
+            loaded = OHLCVPyramid.load(directory)
+            self.assertEqual(list(loaded.levels), ["1h", "1D"])
+            pd.testing.assert_frame_equal(loaded.query("1D", "2004-05"), self.pyramid.query("1D", "2004-05"))
+            self.assertEqual(loaded.query("1D").index.name, "date")
+        finally:
+            shutil.rmtree(directory)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            OHLCVPyramid.from_frame(self.data.reset_index())
+        with self.assertRaises(ValueError):
+            DataProcessor("unused.csv").build_pyramid()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import pandas as pd
+import numpy as np
+from rolling import rolling_moments, rolling_quantiles
+
+
+class TestRolling(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup a random walk with a gap of missing values.
+        """
+        rng = np.random.default_rng(3)
+        self.values = 100 + np.cumsum(rng.normal(0, 1, 400))
+        self.values[50:52] = np.nan
+        self.series = pd.Series(self.values)
+
+    def test_rolling_quantiles(self):
+        """
+        Test quantiles match pandas for windows on both sides of the engine switch.
+        """
+        for quantiles in [[0.25, 0.5, 0.75], [0.0, 0.1, 1.0], [0.5]]:
+            for window in [1, 4, 9, 24, 32, 33, 60, 150]:
+                result = rolling_quantiles(self.values, window, quantiles)
+                for i, q in enumerate(quantiles):
+                    expected = self.series.rolling(window).quantile(q).to_numpy()
+                    np.testing.assert_allclose(result[i], expected, rtol=1e-12)
+
+    def test_rolling_quantiles_short_input(self):
+        """
+        Test a window longer than the data gives only NaN.
+        """
+        self.assertTrue(np.isnan(rolling_quantiles(self.values[:3], 5, [0.5])).all())
+
+    def test_rolling_moments(self):
+        """
+        Test means and variances of several windows match pandas.
+        """
+        windows = [2, 7, 33]
+        mean, var = np.empty((3, len(self.values))), np.empty((3, len(self.values)))
+        rolling_moments(self.values, windows, mean, var)
+        for i, window in enumerate(windows):
+            np.testing.assert_allclose(mean[i], self.series.rolling(window).mean(), rtol=1e-10)
+            np.testing.assert_allclose(var[i], self.series.rolling(window).var(), rtol=1e-7)
+
+
+if __name__ == "__main__":
+    unittest.main()
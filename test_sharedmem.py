@@ -0,0 +1,68 @@
+import unittest
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+from compact import CompactOHLCV
+from sharedmem import SharedDatasetRegistry, attach, published
+from Statssummaries import Statssummaries
+
+
+def summary_in_worker(name, root):
+    """
+    compute a summary in another process from the shared dataset
+    """
+    return Statssummaries.from_shared(name, root).summary(rolling_window=5, roc_period=3, atr_window=4)
+
+
+class TestSharedMemory(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup a registry in a temporary root and sample OHLCV bars.
+        """
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        rng = np.random.default_rng(5)
+        close = 100 + np.cumsum(rng.normal(0, 1, 200))
+        self.data = pd.DataFrame({"close": close, "high": close + 1, "low": close - 1, "open": close,
+                                  "volume": rng.uniform(100, 900, 200)},
+                                 index=pd.date_range("2024-01-01", periods=200, freq="h", name="date"))
+
+    def test_publish_and_attach(self):
+        with SharedDatasetRegistry(self.root) as registry:
+            registry.publish("000001", self.data, dtype=np.float64)
+            self.assertEqual(published(self.root), ["000001"])
+            store = attach("000001", self.root)
+            pd.testing.assert_frame_equal(store.to_frame(), self.data, check_freq=False)
+            self.assertFalse(store.values.flags.writeable)
+            self.assertIsInstance(store.values.base, np.memmap)
+            with self.assertRaises(ValueError):
+                registry.publish("000001", self.data)
+            registry.publish("000001", CompactOHLCV.from_frame(self.data), replace=True)
+            self.assertEqual(attach("000001", self.root).values.dtype, np.float32)
+        # closing the registry removes what it published, an attached store stays readable
+        self.assertEqual(published(self.root), [])
+        self.assertEqual(len(store["close"]), 200)
+        with self.assertRaises(KeyError):
+            attach("000001", self.root)
+
+    def test_workers_attach_by_name(self):
+        registry = SharedDatasetRegistry(self.root)
+        registry.publish("000001", self.data, dtype=np.float64)
+        expected = Statssummaries(self.data).summary(rolling_window=5, roc_period=3, atr_window=4)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(summary_in_worker, ["000001"] * 2, [self.root] * 2))
+        for result in results:
+            pd.testing.assert_frame_equal(result, expected, check_freq=False)
+        registry.unpublish("000001")
+        self.assertFalse(os.path.exists(os.path.join(self.root, "000001")))
+        with self.assertRaises(KeyError):
+            registry.unpublish("000001")
+        with self.assertRaises(ValueError):
+            registry.publish("../escape", self.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 import pandas as pd
 import numpy as np
-from Statssummaries import Statssummaries
+from Statssummaries import Statssummaries, PanelStatssummaries
 
 class TestStatssummaries(unittest.TestCase):
     def setUp(self):
@@ -62,6 +62,14 @@ class TestStatssummaries(unittest.TestCase):
 
         pd.testing.assert_series_equal(result, expected_atr, check_dtype=False)
 
+        # Wilder smoothing: seeded with the first 3-bar mean, then atr += (tr - atr) / 3
+        wilder = stats.calculate_volatility(method='atr', window=3, smoothing='wilder')
+        expected_wilder = [np.nan, np.nan, true_range[:3].mean()]
+        for value in true_range[3:]:
+            expected_wilder.append(expected_wilder[-1] + (value - expected_wilder[-1]) / 3)
+        np.testing.assert_allclose(wilder.to_numpy(), expected_wilder)
+        pd.testing.assert_series_equal(stats.calculate_volatility(method='atr', window=3), result)
+
     def test_calculate_rate_of_change(self):
         """
         Test rate of change calculation.
@@ -95,6 +103,50 @@ class TestStatssummaries(unittest.TestCase):
         self.assertEqual(len(seasonal), len(self.sample_data))
         self.assertEqual(len(residual), len(self.sample_data))
 
+    def test_seasonal_decomposition_matches_day_of_month_grouping(self):
+        """
+        Test the vectorized decomposition equals grouping the detrended series by day of month.
+        """
+        rng = np.random.default_rng(1)
+        close = 100 + np.cumsum(rng.normal(0, 1, 120))
+        data = pd.DataFrame({'close': close}, index=pd.date_range(start="2024-01-01", periods=120, freq="D"))
+        stats = Statssummaries(data=data, price_column='close')
+        for method in ['additive', 'multiplicative']:
+            decomposition = stats.simple_seasonal_decomposition(method=method, freq=5)
+            trend = data['close'].rolling(5, center=True).mean()
+            detrended = data['close'] - trend if method == 'additive' else data['close'] / trend
+            expected = detrended.groupby(data.index.strftime('%d')).transform('mean')
+            pd.testing.assert_series_equal(decomposition['seasonal'], expected, rtol=1e-12)
+
+    def test_seasonal_decomposition_periods(self):
+        """
+        Test several seasonal periods are removed in one call.
+        """
+        index = pd.date_range(start="2024-01-01", periods=6 * 24 * 14, freq="10min")
+        minute_of_day = index.hour * 60 + index.minute
+        daily = np.sin(2 * np.pi * minute_of_day / 1440)
+        weekly = 0.5 * (index.dayofweek >= 5)
+        data = pd.DataFrame({'close': 100 + daily + weekly}, index=index)
+        stats = Statssummaries(data=data, price_column='close')
+
+        decomposition = stats.simple_seasonal_decomposition(freq=144, periods=['1D', '7D'])
+        seasonal = decomposition['seasonal_1D'] + decomposition['seasonal_7D']
+        pd.testing.assert_series_equal(decomposition['seasonal'], seasonal)
+
+        # each season is the mean per phase of what the previous seasons left, phases counted from the epoch
+        detrended = data['close'] - data['close'].rolling(144, center=True).mean()
+        daily_expected = detrended.groupby(minute_of_day).transform('mean')
+        pd.testing.assert_series_equal(decomposition['seasonal_1D'], daily_expected, rtol=1e-9)
+        week_phase = (index - pd.Timestamp(0)) % pd.Timedelta('7D')
+        weekly_expected = (detrended - daily_expected).groupby(week_phase).transform('mean')
+        pd.testing.assert_series_equal(decomposition['seasonal_7D'], weekly_expected, rtol=1e-9, atol=1e-12)
+
+        # on a regular grid starting at midnight a row count gives the same phases as the duration
+        by_rows = stats.simple_seasonal_decomposition(freq=144, periods=[144])
+        pd.testing.assert_series_equal(by_rows['seasonal_144'], decomposition['seasonal_1D'])
+        with self.assertRaises(ValueError):
+            stats.simple_seasonal_decomposition(periods=[0])
+
     def test_summary(self):
         """
         Test summary statistics combining multiple metrics.
@@ -108,6 +160,190 @@ class TestStatssummaries(unittest.TestCase):
         self.assertIn('Rate_of_Change(%)', result.columns)
         self.assertIn('ATR', result.columns)
 
+    def test_summary_without_copy(self):
+        """
+        Test copy=False shares the caller's arrays and matches the copying path.
+        """
+        data = self.sample_data.astype(float)
+        data.iloc[0, 0] = np.nan
+        stats = Statssummaries(data=data, price_column='close', copy=False)
+        self.assertTrue(np.shares_memory(stats.data['high'].to_numpy(), data['high'].to_numpy()))
+
+        result = stats.summary(rolling_window=3, roc_period=3, atr_window=3)
+        expected = Statssummaries(data=data, price_column='close').summary(rolling_window=3, roc_period=3, atr_window=3)
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertEqual(result['close'].iloc[0], 0)
+        self.assertTrue(np.isnan(data['close'].iloc[0]))
+
+    def test_summary_out(self):
+        """
+        Test summary writes the metric columns into preallocated arrays and frames.
+        """
+        stats = Statssummaries(data=self.sample_data, price_column='close')
+        expected = stats.summary(rolling_window=3, roc_period=3, atr_window=3)
+
+        buffers = {'Rolling_Mean': np.full(10, -1.0), 'ATR': np.full(10, -1.0)}
+        mean_buffer = buffers['Rolling_Mean']
+        result = stats.summary(rolling_window=3, roc_period=3, atr_window=3, out=buffers)
+        self.assertIs(result, buffers)
+        self.assertIs(buffers['Rolling_Mean'], mean_buffer)
+        for name in ['Rolling_Mean', 'Rolling_Std', 'Rate_of_Change(%)', 'ATR']:
+            np.testing.assert_array_equal(buffers[name], expected[name].to_numpy())
+
+        frame = pd.DataFrame({'ATR': np.full(10, -1.0)}, index=self.sample_data.index)
+        stats.summary(rolling_window=3, roc_period=3, atr_window=3, out=frame)
+        pd.testing.assert_frame_equal(frame, expected[['ATR', 'Rolling_Mean', 'Rolling_Std', 'Rate_of_Change(%)']])
+
+        with self.assertRaises(ValueError):
+            stats.summary(out=frame.iloc[1:])
+        with self.assertRaises(ValueError):
+            stats.summary(out={'ATR': np.empty(3)})
+
+    def test_memoization(self):
+        """
+        Test intermediate results are reused and dropped when data is replaced.
+        """
+        stats = Statssummaries(data=self.sample_data, price_column='close')
+        first = stats.calculate_volatility(method='atr', window=3)
+        second = stats.calculate_volatility(method='atr', window=3)
+        self.assertTrue(np.shares_memory(first.to_numpy(), second.to_numpy()))
+
+        stats.simple_seasonal_decomposition(method='additive', freq=3)
+        stats.simple_seasonal_decomposition(method='multiplicative', freq=3)
+        self.assertGreaterEqual(stats.cache_info()['hits'], 2)
+
+        stats.data = self.sample_data * 2
+        pd.testing.assert_series_equal(stats.calculate_volatility(method='atr', window=3), first * 2)
+
+    def test_memoized_results_are_not_shared(self):
+        """
+        Test modifying a returned Series in place does not change later results.
+        """
+        stats = Statssummaries(data=self.sample_data, price_column='close')
+        expected = stats.summary(rolling_window=3, roc_period=1, atr_window=3)
+        roc = stats.calculate_rate_of_change(period=1)
+        roc.fillna(-999, inplace=True)
+        atr = stats.calculate_volatility(method='atr', window=3)
+        atr *= 0
+        rolling = stats.calculate_rolling_statistics(window=3, metrics=['mean'])
+        rolling['Rolling_Mean'] *= 0
+        pd.testing.assert_frame_equal(stats.summary(rolling_window=3, roc_period=1, atr_window=3), expected)
+        self.assertTrue(stats.calculate_rate_of_change(period=1).isna().iloc[0])
+
+    def test_memoization_detects_reassigned_columns(self):
+        """
+        Test replacing a column of data recomputes the results that read it, and only those.
+        """
+        stats = Statssummaries(data=self.sample_data, price_column='close')
+        stats.summary(rolling_window=3, roc_period=1, atr_window=3)
+        stats.data['close'] = stats.data['close'] * 2
+        fresh = Statssummaries(data=stats.data, price_column='close', cache_size=0)
+        pd.testing.assert_frame_equal(stats.summary(rolling_window=3, roc_period=1, atr_window=3),
+                                      fresh.summary(rolling_window=3, roc_period=1, atr_window=3))
+        stats.data['high'] = stats.data['high'] + 1
+        hits = stats.cache_info()['hits']
+        pd.testing.assert_series_equal(stats.calculate_volatility(method='atr', window=3),
+                                       Statssummaries(data=stats.data, cache_size=0).calculate_volatility('atr', 3))
+        stats.calculate_rate_of_change(period=1)
+        self.assertEqual(stats.cache_info()['hits'], hits + 1)
+
+    def test_memoization_lru_eviction(self):
+        """
+        Test the cache never holds more than cache_size entries.
+        """
+        stats = Statssummaries(data=self.sample_data, price_column='close', cache_size=2)
+        for window in [2, 3, 4]:
+            stats.calculate_rolling_statistics(window=window, metrics=['mean'])
+        self.assertEqual(stats.cache_info()['size'], 2)
+        stats.calculate_rolling_statistics(window=2, metrics=['mean'])
+        self.assertEqual(stats.cache_info()['misses'], 4)
+
+    def test_rolling_sweep(self):
+        """
+        Test the one-pass sweep matches per-window rolling statistics and ATR.
+        """
+        rng = np.random.default_rng(0)
+        close = 100 + np.cumsum(rng.normal(0, 1, 300))
+        data = pd.DataFrame({'close': close, 'high': close + 1, 'low': close - 1},
+                            index=pd.date_range(start="2024-01-01", periods=300, freq="D"))
+        data.iloc[100, 0] = np.nan
+        stats = Statssummaries(data=data, price_column='close')
+        windows = [1, 2, 5, 17, 64, 100]
+        result = stats.rolling_sweep(windows, metrics=['mean', 'std', 'atr'])
+
+        for window in windows:
+            expected = stats.calculate_rolling_statistics(window=window, metrics=['mean', 'std'])
+            pd.testing.assert_series_equal(result[('Rolling_Mean', window)], expected['Rolling_Mean'],
+                                           check_names=False, rtol=1e-9)
+            pd.testing.assert_series_equal(result[('Rolling_Std', window)], expected['Rolling_Std'],
+                                           check_names=False, rtol=1e-7)
+            pd.testing.assert_series_equal(result[('ATR', window)], stats.calculate_volatility(method='atr', window=window),
+                                           check_names=False, rtol=1e-9)
+
+        array = stats.rolling_sweep(windows, metrics=['std', 'mean'], as_array=True)
+        self.assertEqual(array.shape, (300, 2, len(windows)))
+        np.testing.assert_allclose(array[:, 1, 2], result[('Rolling_Mean', 5)])
+
+    def test_rolling_sweep_invalid(self):
+        """
+        Test unsupported sweep metrics and windows raise ValueError.
+        """
+        stats = Statssummaries(data=self.sample_data, price_column='close')
+        with self.assertRaises(ValueError):
+            stats.rolling_sweep([3], metrics=['median'])
+        with self.assertRaises(ValueError):
+            stats.rolling_sweep([0, 3])
+
+
+class TestPanelStatssummaries(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup a long-format panel with two symbols of different length and scale.
+        """
+        rng = np.random.default_rng(0)
+        frames = []
+        for symbol, periods, scale in [('AAA', 40, 1000.0), ('BBB', 25, 0.5)]:
+            close = scale * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+            frame = pd.DataFrame({
+                'symbol': symbol,
+                'close': close,
+                'high': close * 1.01,
+                'low': close * 0.98,
+            }, index=pd.date_range(start="2024-01-01", periods=periods, freq="D", name='date'))
+            frames.append(frame)
+        self.frames = frames
+        self.panel = pd.concat(frames)
+
+    def test_summary_matches_per_symbol(self):
+        """
+        Test the panel summary equals per-symbol summaries.
+        """
+        result = PanelStatssummaries(self.panel, price_column='close').summary(rolling_window=5, roc_period=3, atr_window=4)
+
+        for frame in self.frames:
+            symbol = frame['symbol'].iloc[0]
+            expected = Statssummaries(frame.drop(columns='symbol'), price_column='close').summary(
+                rolling_window=5, roc_period=3, atr_window=4)
+            pd.testing.assert_frame_equal(result.xs(symbol), expected, check_freq=False, rtol=1e-9)
+
+    def test_multiindex_input(self):
+        """
+        Test a (symbol, date) MultiIndex panel gives the same result as long format.
+        """
+        indexed = self.panel.set_index('symbol', append=True).swaplevel(0, 1)
+        from_long = PanelStatssummaries(self.panel).calculate_volatility(method='atr', window=3)
+        from_index = PanelStatssummaries(indexed).calculate_volatility(method='atr', window=3)
+
+        pd.testing.assert_series_equal(from_long, from_index)
+        self.assertTrue(np.isnan(from_long.loc['BBB'].iloc[1]))
+
+    def test_missing_symbol_column(self):
+        """
+        Test panel construction without symbol information raises ValueError.
+        """
+        with self.assertRaises(ValueError):
+            PanelStatssummaries(self.panel.drop(columns='symbol'))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+import pandas as pd
+import numpy as np
+from Statssummaries import Statssummaries
+from processor import DataProcessor
+from streaming import IncrementalResampler, IncrementalStatssummaries, RollingMedian
+
+
+class TestIncrementalStatssummaries(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup test environment with a random walk including a gap of missing prices.
+        """
+        rng = np.random.default_rng(1)
+        close = 50 + np.cumsum(rng.normal(0, 1, 200))
+        self.sample_data = pd.DataFrame({
+            'close': close,
+            'high': close + rng.uniform(0, 2, 200),
+            'low': close - rng.uniform(0, 2, 200),
+        }, index=pd.date_range(start="2024-01-01", periods=200, freq="D"))
+        self.sample_data.iloc[50:53, 0] = np.nan
+
+    def test_update_matches_batch(self):
+        """
+        Test streaming updates reproduce the batch metrics bar by bar.
+        """
+        calculator = IncrementalStatssummaries(rolling_window=8, roc_period=5, atr_window=6)
+        result = pd.DataFrame([calculator.update(bar) for _, bar in self.sample_data.iterrows()],
+                              index=self.sample_data.index)
+
+        stats = Statssummaries(data=self.sample_data, price_column='close')
+        expected = stats.calculate_rolling_statistics(window=8, metrics=['mean', 'median', 'std'])
+        expected['Rate_of_Change(%)'] = stats.calculate_rate_of_change(period=5)
+        expected['ATR'] = stats.calculate_volatility(method='atr', window=6)
+
+        pd.testing.assert_frame_equal(result, expected, check_freq=False, rtol=1e-9)
+
+    def test_from_statssummaries(self):
+        """
+        Test a warmed-up calculator continues exactly where the history stops.
+        """
+        stats = Statssummaries(data=self.sample_data.iloc[:150], price_column='close')
+        calculator = IncrementalStatssummaries.from_statssummaries(stats, rolling_window=10, roc_period=3,
+                                                                   atr_window=4, metrics=['mean', 'std'])
+        latest = calculator.update(self.sample_data.iloc[150])
+
+        full = Statssummaries(data=self.sample_data.iloc[:151], price_column='close')
+        self.assertAlmostEqual(latest['Rolling_Mean'], full.calculate_rolling_statistics(10, ['mean']).iloc[-1, 0])
+        self.assertAlmostEqual(latest['ATR'], full.calculate_volatility(method='atr', window=4).iloc[-1])
+        self.assertNotIn('Rolling_Median', latest)
+
+    def test_rolling_median_duplicates(self):
+        """
+        Test the two-heap median with repeated values leaving the window.
+        """
+        values = [3, 1, 3, 3, 2, 2, 5, 1, 1, 1, 4]
+        median = RollingMedian(4)
+        result = []
+        for value in values:
+            median.push(float(value))
+            result.append(median.get_median())
+        expected = pd.Series(values, dtype=float).rolling(4).median().tolist()
+        np.testing.assert_array_equal(result, expected)
+
+    def test_unsupported_metric(self):
+        """
+        Test unsupported metrics raise ValueError.
+        """
+        with self.assertRaises(ValueError):
+            IncrementalStatssummaries(metrics=['max'])
+
+
+class TestIncrementalResampler(unittest.TestCase):
+    def setUp(self):
+        """
+        Setup irregular intraday bars with missing prices, delivered in batches shuffled within 20 rows.
+        """
+        rng = np.random.default_rng(3)
+        index = pd.date_range("2024-01-01 09:30", periods=3000, freq="7min", name="date")
+        index = index[np.sort(rng.choice(3000, 2000, replace=False))]
+        self.data = pd.DataFrame({'close': rng.normal(100, 5, 2000), 'volume': rng.integers(1, 100, 2000)}, index=index)
+        self.data.iloc[rng.choice(2000, 300), 0] = np.nan
+        order = np.arange(2000)
+        for start in range(0, 2000, 20):
+            rng.shuffle(order[start:start + 20])
+        self.shuffled = self.data.iloc[order]
+        self.batches = np.split(np.arange(2000), np.sort(rng.choice(2000, 15, replace=False)))
+        self.processor = DataProcessor("unused.csv")
+        self.processor.data = self.data
+
+    def test_matches_resample_data(self):
+        for frequency in ['h', '3h', 'D', '2D', 'W']:
+            for agg_method in ['mean', 'sum', 'last', 'ohlc']:
+                resampler = IncrementalResampler(frequency, agg_method, allowed_lateness='6h')
+                for batch in self.batches:
+                    resampler.update(self.shuffled.iloc[batch])
+                expected = self.processor.resample_data(frequency, agg_method)
+                pd.testing.assert_frame_equal(resampler.result(), expected, check_freq=False)
+
+    def test_update_returns_affected_buckets(self):
+        resampler = IncrementalResampler('h', 'mean')
+        resampler.update(self.data.iloc[:1000])
+        affected = resampler.update(self.data.iloc[1000:1010])
+        self.assertLessEqual(len(affected), 3)
+        pd.testing.assert_frame_equal(affected, resampler.result().loc[affected.index])
+
+        # a late row only touches its own bucket
+        late = self.data.iloc[[10]] + 1
+        affected = resampler.update(late)
+        self.assertEqual(list(affected.index), [late.index[0].floor('h')])
+
+    def test_lateness(self):
+        resampler = IncrementalResampler('h', 'sum', allowed_lateness='1h')
+        resampler.update(self.data.iloc[:100])
+        with self.assertRaises(ValueError):
+            resampler.update(self.data.iloc[[0]])
+        dropping = IncrementalResampler('h', 'sum', allowed_lateness='1h', on_late='drop')
+        dropping.update(self.data.iloc[:100])
+        dropping.update(self.data.iloc[[0, 100]])
+        self.assertEqual(dropping.late_rows, 1)
+        pd.testing.assert_frame_equal(dropping.result(), self.data.iloc[:101].resample('h').sum(), check_freq=False)
+
+        with self.assertRaises(ValueError):
+            IncrementalResampler('h', 'median')
+
+    def test_rejected_batch_leaves_state_unchanged(self):
+        resampler = IncrementalResampler('3h', 'ohlc', allowed_lateness='5D', on_late='drop')
+        resampler.update(self.data.iloc[500:600])
+        watermark, late_rows, result = resampler.watermark, resampler.late_rows, resampler.result()
+        # a row before the first day seen, together with a new latest row
+        with self.assertRaises(ValueError):
+            resampler.update(self.data.iloc[[0, 1500]])
+        self.assertEqual((resampler.watermark, resampler.late_rows), (watermark, late_rows))
+        pd.testing.assert_frame_equal(resampler.result(), result)
+        resampler.update(self.data.iloc[600:700])
+        self.assertEqual(resampler.late_rows, 0)
+        expected = IncrementalResampler('3h', 'ohlc')
+        expected.update(self.data.iloc[500:700])
+        pd.testing.assert_frame_equal(resampler.result(), expected.result())
+
+        # a rejected first batch does not fix the columns or the bins
+        first = IncrementalResampler('3h', 'sum', allowed_lateness='1h')
+        with self.assertRaises(ValueError):
+            first.update(self.data.iloc[[100, 0]])
+        first.update(self.data.iloc[[0, 100]][['close']])
+        self.assertEqual(list(first.result().columns), ['close'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
 from unittest.mock import patch
-from Visualization import VisualizationModule
-from statssummaries import Statssummaries
+import os
+import shutil
+import tempfile
+from Visualization import VisualizationModule, lttb_indices, minmax_indices
+from Statssummaries import Statssummaries
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -33,6 +36,51 @@ class TestVisualizationModule(unittest.TestCase):
             self.visualization_module.plot_volatility(atr_window=14)
         mock_show.assert_called_once()  
 
+    def test_downsampling_keeps_extremes(self):
+        '''
+        @purpose: Verifies that both downsampling methods keep the endpoints and the largest spike and dip of a long series.
+        '''
+        y = np.sin(np.linspace(0, 60, 100000))
+        y[31337], y[77777] = 5.0, -5.0
+        for positions in [minmax_indices(y, 1000), lttb_indices(np.arange(len(y)), y, 1000)]:
+            self.assertLessEqual(len(positions), 1000)
+            self.assertTrue(np.all(np.diff(positions) > 0))
+            self.assertEqual((positions[0], positions[-1]), (0, len(y) - 1))
+            self.assertIn(31337, positions)
+            self.assertIn(77777, positions)
+        np.testing.assert_array_equal(minmax_indices(y[:500], 1000), np.arange(500))
+
+    def test_long_series_is_downsampled(self):
+        '''
+        @purpose: Verifies that plot lines of a long series hold at most max_points points while short ones are plotted in full.
+        '''
+        index = pd.date_range('2020-01-01', periods=50000, freq='min')
+        tools = Statssummaries(pd.DataFrame({'close': np.random.randn(50000).cumsum() + 100}, index=index))
+        for method in ['minmax', 'lttb']:
+            module = VisualizationModule(tools.data, tools, max_points=2000, downsample=method)
+            with patch('matplotlib.pyplot.show'):
+                module.plot_price_with_moving_averages(window_short=20, window_long=50)
+            lines = plt.gcf().axes[0].get_lines()
+            self.assertTrue(all(len(line.get_xdata()) <= 2000 for line in lines))
+            if method == 'minmax':
+                self.assertEqual(lines[0].get_ydata().max(), tools.data['close'].max())
+            plt.close('all')
+        with self.assertRaises(ValueError):
+            VisualizationModule(tools.data, tools, downsample='mean')
+
+    def test_batch_mode_saves_files(self):
+        '''
+        @purpose: Verifies that with output_dir the plots are saved as files without calling plt.show().
+        '''
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        module = VisualizationModule(self.data, self.mock_analysis_tools, output_dir=directory, name='000001')
+        with patch('matplotlib.pyplot.show') as mock_show:
+            path = module.plot_volatility(atr_window=14)
+        mock_show.assert_not_called()
+        self.assertEqual(path, os.path.join(directory, '000001_volatility.png'))
+        self.assertGreater(os.path.getsize(path), 0)
+
 
 class MockAnalysisTools:
     '''Imitates the methods calculate_rolling_statistics and calculate_volatility for testing the visualization module and returns mock data iin the functions'''